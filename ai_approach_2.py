@@ -1,58 +1,85 @@
 import pygame
-import random
-import heapq
 
-WIDTH, HEIGHT, TILE = 640, 480, 32
-DIRECTS = [[0, -1], [1, 0], [0, 1], [-1, 0]]
-MOVE_SPEED = [1, 2, 2, 1, 2, 3, 3, 2]
-SHOT_DELAY = [60, 50, 30, 40, 30, 25, 25, 30]
-BULLET_SPEED = [4, 5, 6, 5, 5, 5, 6, 7]
-BULLET_DAMAGE = [1, 1, 2, 3, 2, 2, 3, 4]
+from planner import PENDING, plan_path
+import visibility
+from config import TILE, DIRECTS, MOVE_SPEED, SHOT_DELAY, BULLET_SPEED, BULLET_DAMAGE
 
 class AIApproach2:
-    def __init__(self, tank, objects, snd_shoot=None):
+    """Aggressive heuristics. think() picks a target and plans; steer() drives and fires."""
+    THINK_COST_US = 20  # typical think() without path search, for the AI scheduler
+    STEER_COST_US = 25
+    def __init__(self, tank, world, snd_shoot=None):
         self.tank = tank
-        self.objects = objects
+        self.world = world
+        self.rng = world.rng  # the match's seeded RNG, so matches replay exactly
         self.snd_shoot = snd_shoot
         self.shoot_cooldown = 0
         self.path = []
         self.path_index = 0
+        self.planner = world.make_planner()
         self.target = None
         self.target_type = None
+        self.gate = None  # the block walling us off from the target, to shoot open
         self.last_known_enemy_pos = None
         self.aggression_level = 0.7  # 0-1, higher = more aggressive
         self.has_seen_enemy = False
+        self.enemy = None
+        self.bonuses = []
+
+    def snapshot(self):
+        return (self.shoot_cooldown, self.path, self.path_index, self.target, self.target_type, self.gate,
+                self.last_known_enemy_pos, self.has_seen_enemy, self.enemy, self.bonuses,
+                self.planner.snapshot())
+
+    def restore(self, state):
+        (self.shoot_cooldown, self.path, self.path_index, self.target, self.target_type, self.gate,
+         self.last_known_enemy_pos, self.has_seen_enemy, self.enemy, self.bonuses, planner) = state
+        self.planner.restore(planner)
 
     def update(self):
+        self.think()
+        self.steer()
+
+    def think(self):
         # Find targets
-        enemy = None
-        bonuses = []
-        blocks = [obj for obj in self.objects if obj.type == 'block']
-        
-        for obj in self.objects:
-            if obj.type == 'tank' and obj != self.tank:
-                enemy = obj
-                self.last_known_enemy_pos = (obj.rect.centerx, obj.rect.centery)
-                self.has_seen_enemy = True
-            elif obj.type == 'bonus':
-                bonuses.append(obj)
-
-        # Strategic target selection
-        if not self.target or random.random() < 0.03:  # Re-evaluate more frequently
+        enemy = self.world.nearest_enemy(self.tank)
+        bonuses = list(self.world.bonuses)
+        if enemy:
+            self.last_known_enemy_pos = (enemy.rect.centerx, enemy.rect.centery)
+            self.has_seen_enemy = True
+
+        # Strategic target selection (at once when the hunted tank is destroyed)
+        if (not self.target or self.rng.random() < 0.03 or  # Re-evaluate more frequently
+                self.target_type == 'enemy' and self.target not in self.world.tanks):
             self.choose_strategic_target(enemy, bonuses)
 
         # Get current target position
         target_pos = self.get_target_position()
+        my_center = (self.tank.rect.centerx, self.tank.rect.centery)
+
+        # Walled off from the target: go and shoot open the block between
+        grid = self.world.grid
+        gate = self.world.regions.gate(grid.tile_at(*my_center), grid.tile_at(*target_pos))
+        self.gate = gate[0] if gate else None
 
         # Advanced pathfinding with obstacle avoidance
         if (not self.path or self.path_index >= len(self.path) or 
-            random.random() < 0.02 or self.is_path_blocked()):
-            self.path = self._a_star_path(
-                (self.tank.rect.centerx, self.tank.rect.centery),
-                target_pos,
-                blocks
-            )
-            self.path_index = 0
+            self.rng.random() < 0.02 or self.is_path_blocked()):
+            if gate:  # up beside the block, then into it to face it
+                (col, row), (side_col, side_row) = gate
+                path = plan_path(self.world, self.planner, my_center, (side_col * TILE + TILE // 2, side_row * TILE + TILE // 2), fixed=True)
+                if path and path is not PENDING:
+                    path.append((col * TILE + TILE // 2, row * TILE + TILE // 2))
+            else:
+                path = plan_path(self.world, self.planner, my_center, target_pos, fixed=self.target_type != 'enemy')
+            if path is not PENDING:
+                self.path = path
+                self.path_index = 0
+        self.enemy = enemy
+        self.bonuses = bonuses
+
+    def steer(self):
+        enemy, bonuses = self.enemy, self.bonuses
 
         # Smart movement with predictive positioning
         oldX, oldY = self.tank.rect.topleft
@@ -84,33 +111,32 @@ class AIApproach2:
                 self.path_index += 1
 
         # Enhanced collision handling
-        self.tank.rect.clamp_ip(pygame.Rect(0, 0, WIDTH, HEIGHT))
+        self.tank.rect.clamp_ip(pygame.Rect(0, 0, self.world.width, self.world.height))
         collision = False
-        for obj in self.objects:
-            if obj != self.tank and (obj.type == 'block' or obj.type == 'tank') and self.tank.rect.colliderect(obj.rect):
-                collision = True
-                # Try to path around the obstacle
-                if obj.type == 'block' and random.random() < 0.3:
-                    self.path = []
-                    self.path_index = 0
-                break
+        if self.tank.collides_with_tank():
+            collision = True
+        elif self.world.grid.rect_blocked(self.tank.rect):
+            collision = True
+            # Try to path around the obstacle
+            if self.rng.random() < 0.3:
+                self.path = []
+                self.path_index = 0
 
         if collision:
             self.tank.rect.topleft = oldX, oldY
-            if random.random() < 0.5:  # 50% chance to recalculate path
+            if self.rng.random() < 0.5:  # 50% chance to recalculate path
                 self.path = []
                 self.path_index = 0
 
         # TACTICAL SHOOTING - Competitive against FIS AI
         if self.shoot_cooldown == 0:
-            should_shoot = self.should_shoot(enemy, blocks, bonuses)
+            should_shoot = self.should_shoot(enemy, bonuses)
             
             if should_shoot:
-                from twotanks import Bullet
-                Bullet(self.tank, self.tank.rect.centerx, self.tank.rect.centery,
-                       DIRECTS[self.tank.direct][0] * BULLET_SPEED[self.tank.rank],
-                       DIRECTS[self.tank.direct][1] * BULLET_SPEED[self.tank.rank],
-                       BULLET_DAMAGE[self.tank.rank])
+                self.world.bullets.spawn(self.tank, self.tank.rect.centerx, self.tank.rect.centery,
+                                        DIRECTS[self.tank.direct][0] * BULLET_SPEED[self.tank.rank],
+                                        DIRECTS[self.tank.direct][1] * BULLET_SPEED[self.tank.rank],
+                                        BULLET_DAMAGE[self.tank.rank])
                 if self.snd_shoot:
                     self.snd_shoot.play()
                 self.shoot_cooldown = max(20, SHOT_DELAY[self.tank.rank] - 10)  # Slightly faster shooting
@@ -118,12 +144,11 @@ class AIApproach2:
         if self.shoot_cooldown > 0:
             self.shoot_cooldown -= 1
 
-    def should_shoot(self, enemy, blocks, bonuses):
+    def should_shoot(self, enemy, bonuses):
         """Advanced shooting logic to compete with FIS AI"""
         
-        # 1. HIGH PRIORITY: Shoot at visible enemy
-        if enemy and self.has_line_of_sight(enemy, blocks):
-            # Check if we're facing the enemy
+        # 1. HIGH PRIORITY: Shoot at visible enemy we're facing (the cheap test first)
+        if enemy:
             dx = enemy.rect.centerx - self.tank.rect.centerx
             dy = enemy.rect.centery - self.tank.rect.centery
             
@@ -137,30 +162,38 @@ class AIApproach2:
             elif self.tank.direct == 3 and dx < -10 and abs(dy) < abs(dx):  # Left
                 facing_enemy = True
                 
-            if facing_enemy:
+            if facing_enemy and self.has_line_of_sight(enemy):
                 return True
         
         # 2. MEDIUM PRIORITY: Predictive shooting at last known enemy position
         if self.last_known_enemy_pos and not enemy and self.has_seen_enemy:
-            if random.random() < 0.1:  # 10% chance to shoot at last known position
+            if self.rng.random() < 0.1:  # 10% chance to shoot at last known position
                 return True
         
-        # 3. MEDIUM PRIORITY: Clear path to bonus
+        # 3. MEDIUM PRIORITY: Open the way through the block we face
+        if self.gate:
+            direct = DIRECTS[self.tank.direct]
+            if self.world.grid.tile_at(self.tank.rect.centerx + direct[0] * TILE,
+                                       self.tank.rect.centery + direct[1] * TILE) == self.gate:
+                return True
+
+        # 4. MEDIUM PRIORITY: Clear path to bonus
         if bonuses and self.target_type == 'bonus':
             nearest_bonus = self.target
             if nearest_bonus:
-                blocks_to_bonus = self.count_blocks_to_target(nearest_bonus, blocks)
-                if blocks_to_bonus == 1 and random.random() < 0.3:
+                blocks_to_bonus = self.count_blocks_to_target(nearest_bonus)
+                if blocks_to_bonus == 1 and self.rng.random() < 0.3:
                     return True
         
-        # 4. LOW PRIORITY: Area denial/random suppression
-        if random.random() < 0.02:  # 2% chance for random shots
+        # 5. LOW PRIORITY: Area denial/random suppression
+        if self.rng.random() < 0.02:  # 2% chance for random shots
             return True
             
         return False
 
     def choose_strategic_target(self, enemy, bonuses):
         """Choose targets with high priority on bonus collection for leveling up"""
+        width, height = self.world.width, self.world.height
         priorities = []
         
         current_health = self.tank.hp
@@ -175,8 +208,7 @@ class AIApproach2:
             # Sort bonuses by value (star bonuses give ranks, tank bonuses give health)
             for bonus in bonuses:
                 bonus_value = 2 if bonus.bonusNum == 0 else 1  # Stars are more valuable for leveling
-                distance_to_bonus = ((bonus.rect.centerx - self.tank.rect.centerx)**2 + 
-                                   (bonus.rect.centery - self.tank.rect.centery)**2)
+                distance_to_bonus = self.travel_distance(bonus)
                 
                 # Calculate priority score for each bonus
                 priority_score = bonus_value * (100000 / (distance_to_bonus + 100))
@@ -201,27 +233,23 @@ class AIApproach2:
         if current_health <= 2:
             tank_bonuses = [b for b in bonuses if b.bonusNum == 1]  # Health bonuses
             if tank_bonuses:
-                nearest_health_bonus = min(tank_bonuses, key=lambda b: 
-                    (b.rect.centerx - self.tank.rect.centerx)**2 + 
-                    (b.rect.centery - self.tank.rect.centery)**2)
+                nearest_health_bonus = min(tank_bonuses, key=self.travel_distance)
                 priorities.append((nearest_health_bonus, 'bonus', 8))  # Very high priority
 
         # STRATEGY 5: Default to bonus collection if no immediate threats
         if not priorities and bonuses:
-            nearest_bonus = min(bonuses, key=lambda b: 
-                (b.rect.centerx - self.tank.rect.centerx)**2 + 
-                (b.rect.centery - self.tank.rect.centery)**2)
+            nearest_bonus = min(bonuses, key=self.travel_distance)
             priorities.append((nearest_bonus, 'bonus', 4))
 
         # STRATEGY 6: Fallback - strategic positioning near bonus spawn areas
         bonus_hotspots = [
-            (WIDTH//4, HEIGHT//4),      # Top-left common bonus area
-            (3*WIDTH//4, HEIGHT//4),    # Top-right common bonus area  
-            (WIDTH//4, 3*HEIGHT//4),    # Bottom-left common bonus area
-            (3*WIDTH//4, 3*HEIGHT//4),  # Bottom-right common bonus area
-            (WIDTH//2, HEIGHT//2),      # Center bonus area
+            (width//4, height//4),      # Top-left common bonus area
+            (3*width//4, height//4),    # Top-right common bonus area  
+            (width//4, 3*height//4),    # Bottom-left common bonus area
+            (3*width//4, 3*height//4),  # Bottom-right common bonus area
+            (width//2, height//2),      # Center bonus area
         ]
-        strategic_pos = random.choice(bonus_hotspots)
+        strategic_pos = self.rng.choice(bonus_hotspots)
         priorities.append((strategic_pos, 'strategic', 2))
 
         # Choose the highest priority target
@@ -232,40 +260,32 @@ class AIApproach2:
             self.target_type = priorities[0][1]
         else:
             # Default to center if no targets found
-            self.target = (WIDTH//2, HEIGHT//2)
+            self.target = (width//2, height//2)
             self.target_type = 'strategic'
     
+    def travel_distance(self, bonus):
+        """Squared pixel length of the way to bonus round the blocks (see fields.py)"""
+        grid = self.world.grid
+        field = self.world.fields.get(grid.tile_at(*bonus.rect.center))
+        return (field.travel(grid.tile_at(*self.tank.rect.center)) * TILE) ** 2
+
     def find_safe_position(self, enemy):
         """Find a position away from enemy"""
+        width, height = self.world.width, self.world.height
         if not enemy:
-            return (WIDTH//2, HEIGHT//2)
+            return (width//2, height//2)
             
         # Move to opposite side of map from enemy
-        safe_x = WIDTH - enemy.rect.centerx if enemy.rect.centerx < WIDTH//2 else WIDTH//4
-        safe_y = HEIGHT - enemy.rect.centery if enemy.rect.centery < HEIGHT//2 else HEIGHT//4
+        safe_x = width - enemy.rect.centerx if enemy.rect.centerx < width//2 else width//4
+        safe_y = height - enemy.rect.centery if enemy.rect.centery < height//2 else height//4
         
         return (safe_x, safe_y)
 
-    def count_blocks_to_target(self, target, blocks):
-        """Count how many blocks are between tank and target"""
-        start = (self.tank.rect.centerx, self.tank.rect.centery)
-        end = (target.rect.centerx, target.rect.centery)
-        
-        steps = max(abs(end[0] - start[0]), abs(end[1] - start[1]))
-        if steps == 0:
-            return 0
-            
-        block_set = set()
-        for i in range(1, int(steps)):
-            t = i / steps
-            x = start[0] + (end[0] - start[0]) * t
-            y = start[1] + (end[1] - start[1]) * t
-            
-            for block in blocks:
-                if block.rect.collidepoint(x, y):
-                    block_set.add(id(block))
-                    break
-        return len(block_set)
+    def count_blocks_to_target(self, target):
+        """Count how many blocks are between tank and target (up to 2: only "exactly one" matters)"""
+        return visibility.count_blocks_in_path((self.tank.rect.centerx, self.tank.rect.centery),
+                                               (target.rect.centerx, target.rect.centery),
+                                               self.world.grid, limit=2)
 
     def is_path_blocked(self):
         """Check if current path is blocked by dynamic obstacles"""
@@ -273,9 +293,11 @@ class AIApproach2:
             return False
             
         # Check next few path points for tanks
+        near = pygame.Rect(0, 0, 40, 40)
         for i in range(self.path_index, min(self.path_index + 3, len(self.path))):
             path_point = self.path[i]
-            for obj in self.objects:
+            near.center = path_point
+            for obj in self.world.spatial.query_rect(near):
                 if obj.type == 'tank' and obj != self.tank:
                     distance = ((obj.rect.centerx - path_point[0])**2 + 
                                (obj.rect.centery - path_point[1])**2)
@@ -289,66 +311,7 @@ class AIApproach2:
         else:
             return self.target
 
-    def has_line_of_sight(self, target, blocks):
-        start = (self.tank.rect.centerx, self.tank.rect.centery)
-        end = (target.rect.centerx, target.rect.centery)
-        
-        steps = max(abs(end[0] - start[0]), abs(end[1] - start[1]))
-        if steps == 0:
-            return True
-            
-        for i in range(1, int(steps)):
-            t = i / steps
-            x = start[0] + (end[0] - start[0]) * t
-            y = start[1] + (end[1] - start[1]) * t
-            
-            for block in blocks:
-                if block.rect.collidepoint(x, y):
-                    return False
-        return True
-
-    def _a_star_path(self, start, goal, blocks):
-        def heuristic(a, b):
-            return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-        start_grid = (int(start[0] // TILE), int(start[1] // TILE))
-        goal_grid = (int(goal[0] // TILE), int(goal[1] // TILE))
-
-        open_set = []
-        heapq.heappush(open_set, (0, start_grid))
-        came_from = {}
-        g_score = {start_grid: 0}
-        f_score = {start_grid: heuristic(start_grid, goal_grid)}
-
-        while open_set:
-            current = heapq.heappop(open_set)[1]
-            
-            if current == goal_grid:
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(start_grid)
-                path.reverse()
-                return [(p[0] * TILE + TILE // 2, p[1] * TILE + TILE // 2) for p in path]
-
-            for dx, dy in [(0, -1), (1, 0), (0, 1), (-1, 0)]:
-                neighbor = (current[0] + dx, current[1] + dy)
-                if not (0 <= neighbor[0] < WIDTH // TILE and 0 <= neighbor[1] < HEIGHT // TILE):
-                    continue
-                
-                blocked = any(
-                    (int(block.rect.x // TILE), int(block.rect.y // TILE)) == neighbor 
-                    for block in blocks
-                )
-                if blocked:
-                    continue
-
-                tentative_g_score = g_score[current] + 1
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + heuristic(neighbor, goal_grid)
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-        
-        return None
\ No newline at end of file
+    def has_line_of_sight(self, target):
+        return visibility.has_line_of_sight((self.tank.rect.centerx, self.tank.rect.centery),
+                                            (target.rect.centerx, target.rect.centery),
+                                            self.world.grid)
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""Sprites: loaded from one manifest, packed into one atlas, converted once.
+
+images/manifest.json lists the sprites every match draws ("atlas") and the
+ones nothing draws yet ("lazy", e.g. block_armor, bonus_helmet). The atlas
+sprites are packed into a single colour-keyed Surface. The packed atlas is
+cached in .cache/atlas.bin as raw pixels, so later startups read one file
+instead of decoding a PNG per sprite; the cache is keyed by the manifest
+and the size and mtime of every source image, and rebuilt when any of them
+changes. Lazy sprites are loaded on first get().
+
+Loading needs no display, so the headless engine still has the sprites'
+real sizes (atlas sprites are subsurfaces until then). Once the window
+exists, convert() brings the atlas to the display's pixel format in one go
+and cuts each sprite out of it as its own RLE-accelerated Surface (pygame
+blits those faster than subsurfaces of a big one), so blitting a sprite no
+longer converts the 8-bit palette PNGs' pixels on every frame.
+"""
+import hashlib
+import json
+import os
+import struct
+
+import pygame
+
+from config import TILE
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST = os.path.join(BASE_DIR, 'images', 'manifest.json')
+CACHE = os.path.join(BASE_DIR, '.cache', 'atlas.bin')
+ATLAS_WIDTH = 256
+KEY = (1, 254, 3)  # the atlas' transparent colour, used by no sprite
+
+MAGIC = b'TTAT'
+VERSION = 1
+HEADER = struct.Struct('<4sB20sHHI')  # magic, version, source key, width, height, rects length
+
+def load_image(path):
+    try:
+        return pygame.image.load(path)
+    except (pygame.error, OSError):
+        surf = pygame.Surface((TILE, TILE))
+        surf.fill((200, 0, 200))
+        return surf
+
+def pack(sizes, width=ATLAS_WIDTH):
+    """Shelf-pack {name: (w, h)}, tallest first; return ({name: (x, y, w, h)}, (width, height))."""
+    width = max([width] + [w for w, h in sizes.values()])
+    rects = {}
+    x = y = shelf = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        rects[name] = (x, y, w, h)
+        x += w
+        shelf = max(shelf, h)
+    return rects, (width, y + shelf)
+
+class Assets:
+    def __init__(self, manifest=MANIFEST, cache=CACHE):
+        with open(manifest, 'rb') as f:
+            data = f.read()
+        spec = json.loads(data)
+        folder = os.path.dirname(manifest)
+        self.paths = {name: os.path.join(folder, name + '.png') for name in spec['atlas'] + spec['lazy']}
+        self.atlas_names = spec['atlas']
+        self.cache = cache
+        self.key = self._source_key(data)
+        self.atlas, self.rects = self._read_cache() or self._build_atlas()
+        self.surfaces = {name: self.atlas.subsurface(rect) for name, rect in self.rects.items()}
+        self.converted = False
+
+    def get(self, name):
+        surf = self.surfaces.get(name)
+        if surf is None:
+            surf = load_image(self.paths[name])
+            if self.converted:
+                surf = self._convert(surf)
+            self.surfaces[name] = surf
+        return surf
+
+    def convert(self):
+        """Bring every sprite to the display's pixel format; call after pygame.display.set_mode()."""
+        if self.converted:
+            return
+        self.converted = True
+        self.atlas = self.atlas.convert()
+        for name, surf in self.surfaces.items():
+            rect = self.rects.get(name)
+            self.surfaces[name] = self._convert(self.atlas.subsurface(rect).copy() if rect else surf)
+
+    @staticmethod
+    def _convert(surf):
+        colorkey = surf.get_colorkey()
+        surf = surf.convert_alpha() if surf.get_flags() & pygame.SRCALPHA else surf.convert()
+        if colorkey:
+            surf.set_colorkey(colorkey, pygame.RLEACCEL)
+        return surf
+
+    def _source_key(self, manifest_data):
+        key = hashlib.sha1(manifest_data)
+        for name in self.atlas_names:
+            try:
+                st = os.stat(self.paths[name])
+                key.update(f'{name} {st.st_size} {st.st_mtime_ns}\n'.encode())
+            except OSError:
+                key.update(f'{name} missing\n'.encode())
+        return key.digest()
+
+    def _build_atlas(self):
+        images = {name: load_image(self.paths[name]) for name in self.atlas_names}
+        rects, size = pack({name: img.get_size() for name, img in images.items()})
+        atlas = pygame.Surface(size)
+        atlas.fill(KEY)
+        for name, img in images.items():
+            atlas.blit(img, rects[name][:2])  # the sprites' own colour-keyed pixels stay KEY
+        atlas.set_colorkey(KEY)
+        self._write_cache(atlas, rects)
+        return atlas, rects
+
+    def _read_cache(self):
+        try:
+            with open(self.cache, 'rb') as f:
+                magic, version, key, width, height, n = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC or version != VERSION or key != self.key:
+                    return None
+                rects = {name: tuple(rect) for name, rect in json.loads(f.read(n)).items()}
+                pixels = f.read()
+            atlas = pygame.image.frombytes(pixels, (width, height), 'RGB')
+            atlas.set_colorkey(KEY)
+            return atlas, rects
+        except (OSError, ValueError, struct.error, pygame.error):
+            return None
+
+    def _write_cache(self, atlas, rects):
+        """Best effort: without a writable cache every startup just builds the atlas."""
+        data = json.dumps(rects).encode()
+        tmp = f'{self.cache}.{os.getpid()}'  # tournament workers may all start at once
+        try:
+            os.makedirs(os.path.dirname(self.cache), exist_ok=True)
+            with open(tmp, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, self.key, *atlas.get_size(), len(data)))
+                f.write(data)
+                f.write(pygame.image.tobytes(atlas, 'RGB'))
+            os.replace(tmp, self.cache)
+        except OSError:
+            pass
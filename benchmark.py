@@ -0,0 +1,322 @@
+"""Reproducible micro and tick benchmarks.
+
+Every scenario is built from a fixed seed, so two runs time exactly the same
+work: path planning (from scratch, incremental and down distance fields),
+reachability, line-of-sight queries, collision checks, the bullet pool and
+whole simulation ticks, on an empty map, the default 50-block map, a dense
+maze, large maps, a match full of bullets and a 32 vs 32 battle. Tick
+benchmarks restore a match snapshot, untimed, before each batch of ticks.
+
+Each of the --repeat runs repeats its batch of work until it has taken at
+least MIN_TIME (like timeit's autorange), in CPU time: the suite is
+single-threaded, and time the machine spends on other processes is noise.
+CPU time itself still varies on a shared machine, by 20% and more from one
+second to the next, so each run also times a fixed
+pure-Python loop (calibrate()) and is scaled by it: results are ops/sec on a
+machine that runs that loop in CALIBRATION_TIME. The whole suite is timed
+--rounds times over, each round keeping the median of its runs, and a
+benchmark's result is its best round: a slow spell then costs one round,
+not the result. That is compared against a stored baseline; a benchmark
+slower than the baseline by more than --tolerance is reported as a
+regression (and makes the exit status 1). On a noisy machine, pass a looser
+--tolerance.
+
+    python benchmark.py                 # run all, compare with bench_baseline.json
+    python benchmark.py --filter tick   # only benchmarks whose name contains "tick"
+    python benchmark.py --filter reach,tick --save  # store just those as the new baseline
+
+--save only overwrites the benchmarks that ran, so save the ones a change
+affects and leave the baseline of untouched code alone.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from engine import Match, Block  # before pygame: hides its banner
+import pygame
+
+from config import TILE, WIDTH, HEIGHT, WorldConfig
+from fields import DistanceField
+from grid import OccupancyGrid
+from planner import DStarLite
+from regions import Regions
+from visibility import count_blocks_in_path, has_line_of_sight
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+SEED = 1234
+PAIRS = 200
+MIN_TIME = 0.1  # seconds each timed run lasts at least
+ROUNDS = 3
+CALIBRATION_TIME = 0.002  # seconds calibrate() is scaled to
+TOLERANCE = 0.2  # slowdown reported as a regression
+
+def random_grid(cols, rows, density, seed):
+    grid = OccupancyGrid(cols, rows, TILE)
+    rng = random.Random(seed)
+    for index in rng.sample(range(cols * rows), int(cols * rows * density)):
+        grid.set_blocked(index % cols, index // cols)
+    return grid
+
+def maze_grid(cols, rows, seed):
+    """A perfect maze (recursive backtracker) carved on the odd tiles."""
+    grid = OccupancyGrid(cols, rows, TILE)
+    grid.cells[:] = bytes([1]) * (cols * rows)
+    rng = random.Random(seed)
+    stack = [(1, 1)]
+    grid.cells[cols + 1] = 0
+    while stack:
+        c, r = stack[-1]
+        options = [(c + dc, r + dr, dc, dr) for dc, dr in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                   if 0 < c + dc < cols - 1 and 0 < r + dr < rows - 1 and grid.is_blocked(c + dc, r + dr)]
+        if not options:
+            stack.pop()
+            continue
+        nc, nr, dc, dr = rng.choice(options)
+        grid.cells[(r + dr // 2) * cols + c + dc // 2] = 0
+        grid.cells[nr * cols + nc] = 0
+        stack.append((nc, nr))
+    return grid
+
+def default_match(seed=SEED, config=WorldConfig()):
+    match = Match("ai_vs_ai", seed=seed, config=config)
+    match.reset()
+    return match
+
+def battle_match(teams=(32, 32), config=WorldConfig(64, 48)):
+    match = Match("battle", seed=SEED, config=config, teams=teams)
+    match.reset()
+    return match
+
+def grids():
+    cols, rows = WIDTH // TILE, HEIGHT // TILE
+    return {
+        'empty': OccupancyGrid(cols, rows, TILE),
+        'default': default_match().grid,
+        'maze': maze_grid(cols, rows, SEED),
+        'large': random_grid(cols * 4, rows * 4, 0.15, SEED),
+    }
+
+def free_tile_pairs(grid, n, seed):
+    rng = random.Random(seed)
+    free = [(i % grid.cols, i // grid.cols) for i, b in enumerate(grid.cells) if not b]
+    return [(rng.choice(free), rng.choice(free)) for _ in range(n)]
+
+def point_pairs(grid, n, seed):
+    rng = random.Random(seed)
+    w, h = grid.cols * grid.tile, grid.rows * grid.tile
+    return [((rng.randrange(w), rng.randrange(h)), (rng.randrange(w), rng.randrange(h))) for _ in range(n)]
+
+# Each factory returns a callable that does one batch of work and returns how many ops it did,
+# or (setup, run) when the scenario must be put back, untimed, before each batch.
+
+def bench_plan(grid):
+    pairs = free_tile_pairs(grid, PAIRS, SEED)
+    def run():
+        for start, goal in pairs:
+            DStarLite(grid).plan(start, goal)
+        return len(pairs)
+    return run
+
+def bench_replan(grid):
+    """One planner following its own path to a fixed goal, replanning every tile."""
+    pairs = free_tile_pairs(grid, 20, SEED)
+    def run():
+        ops = 0
+        for start, goal in pairs:
+            planner = DStarLite(grid)
+            path = planner.plan(start, goal) or []
+            for tile in path:
+                planner.plan(tile, goal)
+            ops += 1 + len(path)
+        return ops
+    return run
+
+def bench_field(grid):
+    """A distance field built to each goal, then walked down from the start."""
+    pairs = free_tile_pairs(grid, 20, SEED)
+    def run():
+        for start, goal in pairs:
+            DistanceField(grid, goal).path(start)
+        return len(pairs)
+    return run
+
+def bench_reach(grid):
+    """The connected regions built from scratch, then asked which tile pairs connect."""
+    pairs = free_tile_pairs(grid, PAIRS * 5, SEED)
+    def run():
+        regions = Regions(grid)
+        for start, goal in pairs:
+            regions.reachable(start, goal)
+        return len(pairs)
+    return run
+
+def bench_visibility(grid, query):
+    pairs = point_pairs(grid, PAIRS * 5, SEED)
+    def run():
+        for a, b in pairs:
+            query(a, b, grid)
+        return len(pairs)
+    return run
+
+def bench_collide():
+    """Tank-sized rect against blocks (grid) and tanks (spatial hash), as Tank.update does."""
+    match = default_match()
+    rng = random.Random(SEED)
+    rects = [pygame.Rect(rng.randrange(WIDTH), rng.randrange(HEIGHT), TILE - 5, TILE - 5)
+             for _ in range(PAIRS * 5)]
+    grid, spatial = match.grid, match.spatial
+    def run():
+        for rect in rects:
+            grid.rect_blocked(rect) or any(o.type == 'tank' and rect.colliderect(o.rect)
+                                           for o in spatial.query_rect(rect))
+        return len(rects)
+    return run
+
+def many_bullets(match, n=200):
+    rng = random.Random(SEED)
+    tanks = tuple(match.tanks)
+    for _ in range(n):
+        dx, dy = rng.choice(((0, -5), (5, 0), (0, 5), (-5, 0)))
+        match.bullets.spawn(rng.choice(tanks), rng.randrange(WIDTH), rng.randrange(HEIGHT), dx, dy, 1)
+    return match
+
+def dense_match(extra=80):
+    match = default_match()
+    rng = random.Random(SEED)
+    for _ in range(extra):
+        x, y = rng.randrange(WIDTH // TILE) * TILE, rng.randrange(1, HEIGHT // TILE) * TILE
+        rect = pygame.Rect(x, y, TILE, TILE)
+        if not any(rect.colliderect(obj.rect) for obj in match.spatial.query_rect(rect)):
+            Block(match, x, y, TILE)
+    return match
+
+def empty_match():
+    match = default_match()
+    for block in match.blocks:
+        block.damage(block.hp)
+    return match
+
+def bench_bullets(match, ticks=40):
+    state = match.snapshot()
+    def run():
+        for _ in range(ticks):
+            match.bullets.update(WIDTH, HEIGHT, match.bullet_hit)
+        return ticks
+    return lambda: match.restore(state), run
+
+def bench_ticks(match, ticks=300):
+    state = match.snapshot()
+    def run():
+        for _ in range(ticks):
+            match.step()
+        return match.tick - state[1]  # a match that ends early did fewer ticks
+    return lambda: match.restore(state), run
+
+def benchmarks():
+    """{name: zero-argument factory}; factories build their scenario only when selected."""
+    table = {}
+    for name, grid in grids().items():
+        table[f'plan/{name}'] = lambda g=grid: bench_plan(g)
+        table[f'replan/{name}'] = lambda g=grid: bench_replan(g)
+        table[f'field/{name}'] = lambda g=grid: bench_field(g)
+        table[f'reach/{name}'] = lambda g=grid: bench_reach(g)
+        table[f'los/{name}'] = lambda g=grid: bench_visibility(g, has_line_of_sight)
+        table[f'count_blocks/{name}'] = lambda g=grid: bench_visibility(g, count_blocks_in_path)
+    table['collide/default'] = bench_collide
+    table['bullets/many'] = lambda: bench_bullets(many_bullets(default_match()))
+    table['tick/empty'] = lambda: bench_ticks(empty_match())
+    table['tick/default'] = lambda: bench_ticks(default_match())
+    table['tick/dense'] = lambda: bench_ticks(dense_match())
+    table['tick/bullets'] = lambda: bench_ticks(many_bullets(default_match()))
+    table['tick/large'] = lambda: bench_ticks(default_match(config=WorldConfig(256, 256)), ticks=120)
+    table['tick/battle'] = lambda: bench_ticks(battle_match(), ticks=120)
+    return table
+
+def calibrate(n=20000):
+    """CPU time of a fixed loop, to tell how fast the machine runs just now."""
+    start = time.process_time()
+    total = 0
+    for i in range(n):
+        total += i * i % 7
+    return time.process_time() - start
+
+def measure(bench, repeat, min_time=MIN_TIME):
+    """Median calibrated ops/sec of `repeat` runs, each calling run() until min_time has passed."""
+    setup, run = bench if isinstance(bench, tuple) else (None, bench)
+    rates = []
+    gc.disable()  # like timeit: a collection landing in one run is noise
+    try:
+        for _ in range(repeat):
+            ops = elapsed = 0
+            speed = calibrate()
+            while elapsed < min_time:
+                if setup:
+                    setup()
+                start = time.process_time()
+                ops += run()
+                elapsed += time.process_time() - start
+            speed += calibrate()  # before and after, for the time in between
+            rates.append(ops / elapsed * speed / (2 * CALIBRATION_TIME))
+    finally:
+        gc.enable()
+    return statistics.median(rates)
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)['results']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the seeded benchmark suite.")
+    parser.add_argument('--filter', default='', help="only run benchmarks whose name contains one of these (comma-separated)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per benchmark and round (the median is kept)")
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help="times the suite is timed over (the best is kept)")
+    parser.add_argument('--baseline', default=BASELINE, help="baseline file to compare with / save to")
+    parser.add_argument('--save', action='store_true', help="store the results of the benchmarks run as their new baseline")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="slowdown reported as a regression")
+    args = parser.parse_args()
+    filters = args.filter.split(',')
+
+    benches = {}
+    for name, factory in benchmarks().items():
+        if any(f in name for f in filters):
+            bench = benches[name] = factory()
+            (bench[1] if isinstance(bench, tuple) else bench)()  # warm up caches and the planners' first search
+    results = {}
+    for _ in range(args.rounds):
+        for name, bench in benches.items():
+            results[name] = max(results.get(name, 0), measure(bench, args.repeat))
+
+    baseline = load_baseline(args.baseline)
+    regressions = []
+    print(f"{'benchmark':<22} {'ops/sec':>12} {'baseline':>12} {'change':>8}")
+    for name, ops in results.items():
+        base = baseline.get(name)
+        if base:
+            change = ops / base - 1
+            flag = "  REGRESSION" if change < -args.tolerance else ""
+            if flag:
+                regressions.append(name)
+            print(f"{name:<22} {ops:>12.1f} {base:>12.1f} {change:>+7.1%}{flag}")
+        else:
+            print(f"{name:<22} {ops:>12.1f} {'-':>12} {'-':>8}")
+
+    if args.save:
+        saved = load_baseline(args.baseline)
+        saved.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'results': saved}, f, indent=1, sort_keys=True)
+        print(f"Saved {len(results)} results to {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
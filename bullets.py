@@ -0,0 +1,129 @@
+import numpy as np
+import pygame
+
+class BulletPool:
+    """Every bullet in flight, stored as parallel NumPy arrays.
+
+    update() moves all bullets, culls those that left the map and finds the
+    few that might have hit something (a blocked tile or another tank's
+    rect, all tanks at once) in a handful of array operations, however many
+    tanks there are. Only those candidates go through
+    the exact per-bullet check, in firing order, so a block shot away by one
+    bullet no longer stops the next one during the same tick. Removal
+    compacts the arrays while keeping that order. Bullets pass through the
+    shooter's teammates.
+    """
+    GROW = 2
+
+    def __init__(self, world, capacity=64):
+        self.world = world
+        self.count = 0
+        self.px = np.zeros(capacity)
+        self.py = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.owner_id = np.zeros(capacity, dtype=np.int64)
+        self.owners = np.empty(capacity, dtype=object)
+
+    def __len__(self):
+        return self.count
+
+    def _arrays(self):
+        return ('px', 'py', 'dx', 'dy', 'damage', 'owner_id', 'owners')
+
+    def _grow(self):
+        capacity = len(self.px) * self.GROW
+        for name in self._arrays():
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype) if old.dtype == object else np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, parent, px, py, dx, dy, damage):
+        if self.count == len(self.px):
+            self._grow()
+        i = self.count
+        self.px[i] = px; self.py[i] = py
+        self.dx[i] = dx; self.dy[i] = dy
+        self.damage[i] = damage
+        self.owner_id[i] = id(parent)
+        self.owners[i] = parent
+        self.count += 1
+
+    def snapshot(self):
+        n = self.count
+        return n, tuple(getattr(self, name)[:n].copy() for name in self._arrays())
+
+    def restore(self, state):
+        n, arrays = state
+        while len(self.px) < n:
+            self._grow()
+        for name, saved in zip(self._arrays(), arrays):
+            getattr(self, name)[:n] = saved
+        self.owners[n:self.count] = None
+        self.count = n
+
+    def update(self, width, height, on_hit):
+        """Advance every bullet one tick; on_hit(obj, x, y, damage) is called for each hit."""
+        n = self.count
+        if not n:
+            return
+        px, py = self.px[:n], self.py[:n]
+        px += self.dx[:n]
+        py += self.dy[:n]
+        inside = (px >= 0) & (px <= width) & (py >= 0) & (py <= height)
+
+        world = self.world
+        grid = world.grid
+        ix = px.astype(np.int64)
+        iy = py.astype(np.int64)
+        col = ix // grid.tile
+        row = iy // grid.tile
+        on_map = inside & (col < grid.cols) & (row < grid.rows)
+        cells = np.frombuffer(grid.cells, dtype=np.uint8)
+        maybe_hit = on_map & (cells[np.where(on_map, row * grid.cols + col, 0)] != 0)
+        tanks = tuple(world.tanks)
+        if tanks:
+            rects = np.array([tuple(tank.rect) for tank in tanks])  # one row per tank: x, y, w, h
+            ids = np.array([id(tank) for tank in tanks])
+            x, y, w, h = rects.T
+            tx, ty = ix[:, None] - x, iy[:, None] - y  # bullets down, tanks across
+            over = (tx >= 0) & (tx < w) & (ty >= 0) & (ty < h) & (self.owner_id[:n, None] != ids)
+            maybe_hit |= inside & over.any(axis=1)
+
+        remove = ~inside
+        spatial = world.spatial
+        for j in np.flatnonzero(maybe_hit):
+            x, y = float(px[j]), float(py[j])
+            parent = self.owners[j]
+            for obj in spatial.query_point(x, y):
+                if (obj is not parent and obj.type != 'bonus' and obj.rect.collidepoint(int(x), int(y))
+                        and not (obj.type == 'tank' and obj.team == parent.team)):
+                    remove[j] = True
+                    on_hit(obj, x, y, int(self.damage[j]))
+                    break
+
+        if remove.any():
+            keep = np.flatnonzero(~remove)
+            m = len(keep)
+            for name in self._arrays():
+                arr = getattr(self, name)
+                arr[:m] = arr[:n][keep]
+            self.owners[m:n] = None
+            self.count = m
+
+    def draw(self, surface, alpha=1.0, offset=(0, 0)):
+        """Draw every bullet in view `alpha` of the way through its last move; return the rects touched.
+
+        offset is the camera's top-left corner in map coordinates.
+        """
+        n = self.count
+        back = 1.0 - alpha
+        xs = (self.px[:n] - self.dx[:n] * back).astype(int) - offset[0]
+        ys = (self.py[:n] - self.dy[:n] * back).astype(int) - offset[1]
+        w, h = surface.get_size()
+        visible = (xs > -3) & (xs < w + 3) & (ys > -3) & (ys < h + 3)
+        xs, ys = xs[visible].tolist(), ys[visible].tolist()
+        circle = pygame.draw.circle
+        return [circle(surface, 'yellow', (x, y), 2) for x, y in zip(xs, ys)]
@@ -0,0 +1,37 @@
+"""Game constants and the map configuration shared by every module."""
+
+WIDTH, HEIGHT = 640, 480  # the window, and the default map
+TILE = 32  # the sprites' size, so one tile fits a block and a tank
+
+DIRECTS = [[0, -1], [1, 0], [0, 1], [-1, 0]]
+MOVE_SPEED =    [1, 2, 2, 1, 2, 3, 3, 2]
+BULLET_SPEED =  [4, 5, 6, 5, 5, 5, 6, 7]
+BULLET_DAMAGE = [1, 1, 2, 3, 2, 2, 3, 4]
+SHOT_DELAY =    [60, 50, 30, 40, 30, 25, 25, 30]
+
+class WorldConfig:
+    """Size of a match's map, in tiles, and how many blocks it starts with.
+
+    The map may be far larger than the window (the front-end scrolls a
+    camera over it). Unless given, the block count keeps the original 20x15
+    map's density of 50 blocks.
+    """
+    def __init__(self, cols=WIDTH // TILE, rows=HEIGHT // TILE, blocks=None):
+        self.cols = cols
+        self.rows = rows
+        self.tile = TILE
+        self.width = cols * TILE
+        self.height = rows * TILE
+        self.blocks = blocks if blocks is not None else round(50 * cols * rows / (20 * 15))
+
+    def __repr__(self):
+        return f"WorldConfig({self.cols}, {self.rows}, blocks={self.blocks})"
+
+    @classmethod
+    def parse(cls, text):
+        """'COLSxROWS' or 'COLSxROWS:BLOCKS', e.g. '256x256' (for command lines)."""
+        size, _, blocks = text.partition(':')
+        cols, rows = (int(n) for n in size.lower().split('x'))
+        return cls(cols, rows, int(blocks) if blocks else None)
+
+DEFAULT = WorldConfig()
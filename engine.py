@@ -0,0 +1,545 @@
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+import random
+import struct
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from ai_approach_1 import AIApproach1
+from ai_approach_2 import AIApproach2
+from assets import Assets
+from fields import FieldCache
+from freecells import FreeCells
+from planner import DStarLite
+from planner_worker import AsyncPlanner
+from profiler import FrameProfiler
+from regions import Regions
+from scheduler import AIScheduler
+from tilemap import TileMap, BRICK
+from world import World
+from config import WIDTH, HEIGHT, TILE, DIRECTS, MOVE_SPEED, BULLET_SPEED, BULLET_DAMAGE, SHOT_DELAY, DEFAULT
+
+MOVE_CHANNELS = 2  # engine-sound loops, for the first tanks (blue and red in the two-tank modes)
+
+def build_tank_sprites(images):
+    """Pre-render every rank in all 4 directions, as spawned and shrunk by 5px.
+
+    Returns (rotated, shrunk), each indexed [rank][direct], so tanks only swap
+    references instead of rotating and scaling a new Surface every frame.
+    """
+    rotated, shrunk = [], []
+    for img in images:
+        rotated.append([pygame.transform.rotate(img, -direct * 90) for direct in range(4)])
+        shrunk.append([pygame.transform.scale(r, (max(8, r.get_width() - 5), max(8, r.get_height() - 5)))
+                       for r in rotated[-1]])
+    return rotated, shrunk
+
+# Loading does not need a display, so the headless engine can use the real
+# sprite sizes for its collision rects; the window converts them (see assets.py).
+assets = Assets()
+
+def load_sprites():
+    """Bind the sprite globals to the assets' current surfaces."""
+    global imgBrick, imgTanks, imgBangs, imgBonuses, imgTanksRotated, imgTankSprites
+    imgBrick = assets.get('block_brick')
+    imgTanks = [assets.get(f'tank{i}') for i in range(1, 9)]
+    imgBangs = [assets.get(f'bang{i}') for i in range(1, 4)]
+    imgBonuses = [assets.get('bonus_star'), assets.get('bonus_tank')]
+    imgTanksRotated, imgTankSprites = build_tank_sprites(imgTanks)
+
+def convert_sprites():
+    """Convert every sprite to the display's pixel format; call once after pygame.display.set_mode()."""
+    assets.convert()
+    load_sprites()
+
+load_sprites()
+
+MODES = ("human_vs_human", "human_vs_ai", "ai_vs_ai", "battle")
+TEAM_COLORS = ('blue', 'red', 'green', 'yellow', 'orange', 'purple', 'cyan', 'magenta')
+DEFAULT_TEAMS = (8, 8)
+
+def team_name(i):
+    """'blue', 'red', ... then 'blue 2', 'red 2', ... past the eighth team."""
+    color = TEAM_COLORS[i % len(TEAM_COLORS)]
+    return color if i < len(TEAM_COLORS) else f"{color} {i // len(TEAM_COLORS) + 1}"
+
+def parse_teams(text):
+    """Team sizes from 'NxSIZE' or 'SIZE,SIZE,...', e.g. '2x32' (32 vs 32) or '16x1' (free-for-all)."""
+    if 'x' in text.lower():
+        n, size = (int(v) for v in text.lower().split('x'))
+        return (size,) * n
+    return tuple(int(v) for v in text.split(','))
+
+NO_KEYS = defaultdict(bool)
+
+class Match(World):
+    """All state of one game: entities (see World), RNG and result.
+
+    The match never touches the display, the mixer or the clock, so it can be
+    stepped as fast as the CPU allows. The pygame front-end in twotanks.py
+    drives it once per frame and draws its objects; tournaments and scripts
+    drive it directly (see simulate()).
+
+    All randomness (map, bonuses, AIApproach2's decisions) comes from the
+    match's own RNG, so a seed plus the human players' inputs reproduce a
+    match exactly (see replay.py). Without a seed a random one is picked and
+    kept in `seed`.
+
+    snapshot() captures the whole match (entities, map, bullets, RNG and the
+    AIs' plans) and restore() rewinds to it, e.g. for lookahead rollouts or
+    rollback; see World for what they cost on a large map. A snapshot stays
+    valid until the next reset().
+
+    "battle" is AI tanks only, in as many teams as `teams` has sizes (one
+    tank per team is a free-for-all); even teams play blue_ai, odd ones
+    red_ai. A match ends when only one team has tanks left, and its name
+    (see team_name(); 'blue' or 'red' in the two-tank modes) is the winner.
+
+    The map's size and block count come from `config` (a WorldConfig) and
+    its blocks are placed at random, unless a `layout` (a tilemap.TileMap)
+    gives all three; `tilemap` is the layout in play either way. AI tanks
+    think within ai_budget_us per tick (see scheduler.AIScheduler) and share
+    `fields`, distances to the bonuses and other fixed goals (see fields.py),
+    and `regions`, which parts of the map connect (see regions.py).
+    Given a planning_worker, their path searches run on it instead of
+    inline (see planner_worker.py); that changes when paths arrive, so a
+    replay must be played back the same way.
+    """
+    def __init__(self, mode="human_vs_human", seed=None, sounds=None, audio=False,
+                 blue_ai=AIApproach1, red_ai=AIApproach2, profiler=None, config=DEFAULT,
+                 ai_budget_us=4000, planning_worker=None, teams=DEFAULT_TEAMS, layout=None):
+        self.mode = mode
+        self.teams = tuple(teams) if mode == "battle" else ()
+        self.layout = layout
+        self.config = layout.config if layout else config
+        self.width, self.height = self.config.width, self.config.height
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.sounds = sounds or {}
+        self.audio = audio
+        self.blue_ai = blue_ai
+        self.red_ai = red_ai
+        self.profiler = profiler or FrameProfiler()
+        self.ai_budget_us = ai_budget_us
+        self.ai_scheduler = AIScheduler(ai_budget_us)
+        self.planning_worker = planning_worker
+        self.enemy_index = None
+        self.clear(self.config.cols, self.config.rows, TILE)
+        self.keys = NO_KEYS
+        self.tick = 0
+        self.game_over = False
+        self.winner = None
+
+    def clear(self, cols, rows, tile):
+        World.clear(self, cols, rows, tile)
+        self.fields = FieldCache(self.grid)
+        self.regions = Regions(self.grid)
+
+    def play_sound(self, name):
+        snd = self.sounds.get(name)
+        if snd: snd.play()
+
+    def move_channel(self, index):
+        """The engine-sound channel of the index-th tank, None past MOVE_CHANNELS."""
+        if not self.audio or index >= MOVE_CHANNELS:
+            return None
+        return pygame.mixer.Channel(index)
+
+    def reset(self):
+        self.clear(self.config.cols, self.config.rows, TILE)
+        self.rng = random.Random(self.seed)
+        self.ai_scheduler = AIScheduler(self.ai_budget_us)
+        self.enemy_index = None
+        self.tick = 0
+        width, height = self.width, self.height
+        if self.mode != "ai_vs_ai":
+            # Human players start facing each other within the first screen, whatever the map size
+            width, height = min(width, WIDTH), min(height, HEIGHT)
+        self.bonus_count = 4
+        if self.mode == "battle":
+            self.spawn_teams()
+            self.bonus_count = max(4, sum(self.teams) // 4)
+        elif self.mode == "ai_vs_ai":
+            Tank(self, 'blue', TILE, TILE, 1, (0,0,0,0,0), ai_controlled=True, ai_approach=self.blue_ai)
+            Tank(self, 'red', width - 2*TILE, height - 2*TILE, 3, (0,0,0,0,0), ai_controlled=True, ai_approach=self.red_ai)
+        elif self.mode == "human_vs_ai":
+            Tank(self, 'blue', 100, height//2 - TILE//2, 0, (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_SPACE), ai_controlled=False)
+            Tank(self, 'red', width - 100 - TILE, height//2 - TILE//2, 0, (0,0,0,0,0), ai_controlled=True, ai_approach=AIApproach1)
+        else:
+            Tank(self, 'blue', 100, height//2 - TILE//2, 0, (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_SPACE), ai_controlled=False)
+            Tank(self, 'red', width - 100 - TILE, height//2 - TILE//2, 0, (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_RETURN), ai_controlled=False)
+
+        self.tilemap = self.layout or self.generate_layout()
+        for col, row in self.tilemap.blocks():
+            if self.free_cells.is_free(col, row):  # a loaded map may have bricks on a spawn point
+                Block(self, col * TILE, row * TILE, TILE)
+        if self.mode == "ai_vs_ai":
+            for _ in range(3):
+                self.spawn_bonus_safely()
+        self.game_over = False
+        self.winner = None
+
+    def generate_layout(self):
+        """The seed's random map: config.blocks bricks on free tiles below the top row.
+
+        It has an RNG of its own and only avoids the tanks, so it depends on
+        nothing but the mode, seed and config, and the match plays the same
+        whether it made the layout itself or was handed it (see levelpool.py).
+        """
+        cols, rows = self.config.cols, self.config.rows
+        rng = random.Random(f"{self.seed} map")
+        free = FreeCells(cols, rows, TILE)
+        free.restore(self.free_cells.snapshot())
+        cells = bytearray(cols * rows)
+        below_top = range(1, rows)
+        for n in range(self.config.blocks):
+            tile = free.sample(rng, rows=below_top)
+            if tile is None:
+                raise ValueError(f"{self.config} has no room left for its blocks")
+            i = tile[1] * cols + tile[0]
+            free.insert(n, (i,))
+            cells[i] = BRICK
+        return TileMap(cols, rows, cells)
+
+    def make_planner(self):
+        """A path planner for an AI tank: D* Lite inline, or on the planning worker."""
+        if self.planning_worker:
+            return AsyncPlanner(self, self.planning_worker)
+        return DStarLite(self.grid)
+
+    def spawn_teams(self):
+        """Place each battle team in its own vertical strip of the map, facing the middle."""
+        cols, rows = self.config.cols, self.config.rows
+        strip = cols // len(self.teams)
+        for i, size in enumerate(self.teams):
+            x0 = i * strip
+            slots = [(c, r) for c in range(x0, x0 + strip - 1, 2) for r in range(1, rows - 1, 2)]
+            if len(slots) < size:
+                raise ValueError(f"{self.config} is too small for teams {self.teams}")
+            direct = 1 if x0 + strip // 2 < cols // 2 else 3
+            ai = self.blue_ai if i % 2 == 0 else self.red_ai
+            for c, r in self.rng.sample(slots, size):
+                Tank(self, TEAM_COLORS[i % len(TEAM_COLORS)], c * TILE, r * TILE, direct, (0,0,0,0,0),
+                     ai_controlled=True, ai_approach=ai, team=team_name(i))
+
+    def nearest_enemy(self, tank):
+        """The closest tank of another team, or None.
+
+        Every AI searches the same arrays of tank centres and teams, built at
+        the first query of a tick (and again after a tank is destroyed).
+        """
+        if self.enemy_index is None or self.enemy_index[0] != self.tick:
+            tanks = tuple(self.tanks)
+            codes = {}
+            self.enemy_index = (self.tick, tanks, np.array([t.rect.center for t in tanks]).reshape(-1, 2),
+                                np.array([codes.setdefault(t.team, len(codes)) for t in tanks]), codes)
+        _, tanks, centers, teams, codes = self.enemy_index
+        d = ((centers - tank.rect.center) ** 2).sum(axis=1)
+        enemies = np.flatnonzero(teams != codes.get(tank.team, -1))
+        if not len(enemies):
+            return None
+        return tanks[enemies[d[enemies].argmin()]]
+
+    def bullet_hit(self, obj, px, py, damage):
+        obj.damage(damage)
+        Bang(self, px, py)
+        self.play_sound('explosion')
+
+    def spawn_bonus_safely(self):
+        """Spawn a bonus on a random free tile (see freecells.py), at least 50px from the edges."""
+        randint = self.rng.randint
+        width, height = self.width, self.height
+        tile = self.free_cells.sample(self.rng, range(2, self.config.cols - 2), range(2, self.config.rows - 2))
+        if tile is not None:
+            return Bonus(self, tile[0] * TILE + TILE//2, tile[1] * TILE + TILE//2, randint(0, len(imgBonuses)-1))
+        # Fallback
+        return Bonus(self, randint(50, width-50), randint(50, height-50), randint(0, len(imgBonuses)-1))
+
+    def step(self):
+        """Advance the simulation by one tick (one frame at 60 FPS)."""
+        if self.game_over:
+            return
+        prof = self.profiler
+        prof.start()
+        # FIS: Always maintain ≥4 bonuses, safely spawned
+        while len(self.bonuses) < self.bonus_count:
+            self.spawn_bonus_safely()
+        prof.lap('objects')
+
+        self.bullets.update(self.width, self.height, self.bullet_hit)
+        prof.lap('bullets')
+        self.ai_scheduler.begin_tick([tank.ai_approach for tank in self.tanks if tank.ai_approach])
+        for tank in self.tanks:
+            tank.update()
+            prof.lap('ai' if tank.ai_approach else 'tanks')
+        for bonus in self.bonuses: bonus.update()
+        for bang in self.bangs: bang.update()
+        prof.lap('objects')
+        self.tick += 1
+
+    def state_hash(self):
+        """CRC32 of the simulation state (tanks, bonuses, bullets, map), for desync checks."""
+        parts = [struct.pack('<IB', self.tick, self.game_over), bytes(self.grid.cells)]
+        for tank in self.tanks:
+            parts.append(struct.pack('<iiBiBi', tank.rect.x, tank.rect.y, tank.direct, tank.hp, tank.rank, tank.shotTimer))
+        for bonus in self.bonuses:
+            parts.append(struct.pack('<iiiB', bonus.rect.x, bonus.rect.y, bonus.timer, bonus.bonusNum))
+        n = self.bullets.count
+        parts.append(self.bullets.px[:n].tobytes())
+        parts.append(self.bullets.py[:n].tobytes())
+        return zlib.crc32(b''.join(parts))
+
+    def snapshot(self):
+        return (World.snapshot(self), self.tick, self.game_over, self.winner, self.rng.getstate(),
+                self.ai_scheduler.snapshot())
+
+    def restore(self, state):
+        world, self.tick, self.game_over, self.winner, rng, scheduler = state
+        World.restore(self, world)
+        self.enemy_index = None
+        self.rng.setstate(rng)
+        self.ai_scheduler.restore(scheduler)
+
+class Tank:
+    __slots__ = ('match', 'color', 'rect', 'direct', 'hp', 'shotTimer', 'rank', 'image', 'prev_center',
+                 'sprite_key', 'keyLEFT', 'keyRIGHT', 'keyUP', 'keyDOWN', 'keySHOT', 'ai_controlled',
+                 'is_moving', 'move_channel', 'ai_approach', 'team',
+                 'moveSpeed', 'shotDelay', 'bulletSpeed', 'bulletDamage')
+    type = 'tank'
+
+    def __init__(self, match, color, px, py, direct, keyList, ai_controlled=False, ai_approach=None,
+                 team=None):
+        self.match = match
+        self.color = color
+        self.team = team or color
+        self.rect = pygame.Rect(px, py, TILE, TILE)
+        self.direct = direct
+        self.hp = 5
+        self.shotTimer = 0
+        self.rank = 0
+        self.image = imgTanksRotated[self.rank][self.direct]
+        self.rect = self.image.get_rect(center=self.rect.center)
+        self.prev_center = self.rect.center
+        self.sprite_key = None
+        match.add(self)
+        self.keyLEFT, self.keyRIGHT, self.keyUP, self.keyDOWN, self.keySHOT = keyList
+        self.ai_controlled = ai_controlled
+        self.is_moving = False
+        self.move_channel = match.move_channel(len(match.tanks) - 1)
+
+        self.ai_approach = None
+        if ai_controlled and ai_approach:  # Inject AI behavior
+            if ai_approach == AIApproach1:
+                self.ai_approach = ai_approach(self, match, match.sounds.get('move'), match.sounds.get('shoot'))
+            elif ai_approach == AIApproach2:
+                self.ai_approach = ai_approach(self, match, match.sounds.get('shoot'))
+            else:
+                self.ai_approach = ai_approach(self, match)
+
+    def snapshot(self):
+        ai = self.ai_approach.snapshot() if self.ai_approach else None
+        return (tuple(self.rect), self.direct, self.hp, self.shotTimer, self.rank, self.image,
+                self.prev_center, self.sprite_key, self.is_moving, ai)
+
+    def restore(self, state):
+        (rect, self.direct, self.hp, self.shotTimer, self.rank, self.image,
+         self.prev_center, self.sprite_key, self.is_moving, ai) = state
+        self.rect = pygame.Rect(rect)
+        if ai is not None:
+            self.ai_approach.restore(ai)
+
+    def update(self):
+        self.prev_center = self.rect.center
+        if self.sprite_key != (self.rank, self.direct):
+            self.sprite_key = (self.rank, self.direct)
+            self.image = imgTankSprites[self.rank][self.direct]
+            self.rect = self.image.get_rect(center=self.rect.center)
+
+        self.moveSpeed = MOVE_SPEED[self.rank]
+        self.shotDelay = SHOT_DELAY[self.rank]
+        self.bulletSpeed = BULLET_SPEED[self.rank]
+        self.bulletDamage = BULLET_DAMAGE[self.rank]
+
+        if self.ai_controlled and self.ai_approach:
+            self.match.ai_scheduler.run(self.ai_approach)
+        else:
+            self._player_update()
+        self.match.move(self)
+
+    def _player_update(self):
+        keys = self.match.keys
+        oldX, oldY = self.rect.topleft
+        moving_now = False
+        if keys[self.keyLEFT]:
+            self.rect.x -= self.moveSpeed; self.direct = 3; moving_now = True
+        elif keys[self.keyRIGHT]:
+            self.rect.x += self.moveSpeed; self.direct = 1; moving_now = True
+        elif keys[self.keyUP]:
+            self.rect.y -= self.moveSpeed; self.direct = 0; moving_now = True
+        elif keys[self.keyDOWN]:
+            self.rect.y += self.moveSpeed; self.direct = 2; moving_now = True
+
+        self.rect.clamp_ip(pygame.Rect(0, 0, self.match.width, self.match.height))
+
+        if self.match.grid.rect_blocked(self.rect) or self.collides_with_tank():
+            self.rect.topleft = oldX, oldY
+            moving_now = False
+
+        if moving_now and not self.is_moving:
+            snd_move = self.match.sounds.get('move')
+            if snd_move and self.move_channel: self.move_channel.play(snd_move, loops=-1)
+            self.is_moving = True
+        elif not moving_now and self.is_moving:
+            if self.move_channel: self.move_channel.stop()
+            self.is_moving = False
+
+        if keys[self.keySHOT] and self.shotTimer == 0:
+            self.match.bullets.spawn(self, self.rect.centerx, self.rect.centery,
+                                     DIRECTS[self.direct][0] * self.bulletSpeed,
+                                     DIRECTS[self.direct][1] * self.bulletSpeed,
+                                     self.bulletDamage)
+            self.match.play_sound('shoot')
+            self.shotTimer = self.shotDelay
+
+        if self.shotTimer > 0:
+            self.shotTimer -= 1
+
+    def collides_with_tank(self):
+        for obj in self.match.spatial.query_rect(self.rect):
+            if obj.type == 'tank' and obj != self and self.rect.colliderect(obj.rect):
+                return True
+        return False
+
+    def draw(self, surface, alpha=1.0, offset=(0, 0)):
+        """Blit at the position `alpha` of the way from the previous tick to this one.
+
+        offset is the camera's top-left corner in map coordinates.
+        """
+        ox, oy = offset
+        if alpha >= 1.0:
+            return surface.blit(self.image, self.rect.move(-ox, -oy))
+        (px, py), (cx, cy) = self.prev_center, self.rect.center
+        center = (round(px + (cx - px) * alpha) - ox, round(py + (cy - py) * alpha) - oy)
+        return surface.blit(self.image, self.image.get_rect(center=center))
+
+    def damage(self, value):
+        match = self.match
+        self.hp -= value
+        if self.hp <= 0:
+            match.remove(self)
+            match.enemy_index = None
+            if self.move_channel:
+                self.move_channel.stop()
+            teams_left = {tank.team for tank in match.tanks}
+            if len(teams_left) <= 1 and not match.game_over:
+                match.game_over = True
+                match.winner = teams_left.pop() if teams_left else None
+            match.play_sound('explosion')
+            match.play_sound('dead')
+
+class Bang:
+    __slots__ = ('match', 'px', 'py', 'frame')
+    type = 'bang'
+
+    def __init__(self, match, px, py):
+        self.match = match
+        self.px,self.py=px,py; self.frame=0
+        match.add(self)
+    def snapshot(self): return self.frame
+    def restore(self, state): self.frame = state
+    def update(self):
+        self.frame += 0.2
+        if self.frame >= 3:
+            self.match.remove(self)
+    def draw(self, surface, offset=(0, 0)):
+        img = imgBangs[int(self.frame)]
+        rect = img.get_rect(center=(int(self.px) - offset[0], int(self.py) - offset[1]))
+        return surface.blit(img, rect)
+
+class Block:
+    __slots__ = ('match', 'rect', 'hp')
+    type = 'block'
+
+    def __init__(self, match, px, py, size):
+        self.match = match
+        self.rect=pygame.Rect(px,py,size,size); self.hp=1
+        match.add(self)
+        match.grid.set_blocked(px // TILE, py // TILE)
+    def snapshot(self): return self.hp
+    def restore(self, state): self.hp = state
+    def update(self): pass
+    def draw(self, surface, offset=(0, 0)): return surface.blit(imgBrick, self.rect.move(-offset[0], -offset[1]))
+    def damage(self, value):
+        self.hp -= value
+        if self.hp <= 0:
+            if self.match.remove(self):
+                self.match.grid.set_blocked(self.rect.x // TILE, self.rect.y // TILE, False)
+
+class Bonus:
+    __slots__ = ('match', 'image', 'rect', 'timer', 'bonusNum')
+    type = 'bonus'
+
+    def __init__(self, match, px, py, bonusNum):
+        self.match = match
+        self.image = imgBonuses[bonusNum]
+        self.rect = self.image.get_rect(center=(px, py))
+        match.add(self)
+        self.timer = 900  # 15 seconds
+        self.bonusNum = bonusNum
+    def snapshot(self): return self.timer
+    def restore(self, state): self.timer = state
+    def update(self):
+        if self.timer > 0:
+            self.timer -= 1
+        else:
+            self.match.remove(self)
+            return
+        for obj in self.match.spatial.query_rect(self.rect):
+            if obj.type == 'tank' and self.rect.colliderect(obj.rect):
+                if self.bonusNum == 0 and obj.rank < len(imgTanks) - 1:
+                    obj.rank += 1
+                    self.match.play_sound('bonus')
+                elif self.bonusNum == 1:
+                    obj.hp += 1
+                    self.match.play_sound('bonus')
+                self.match.remove(self)
+                break
+    def draw(self, surface, offset=(0, 0)):
+        if self.timer % 30 < 15:
+            return surface.blit(self.image, self.rect.move(-offset[0], -offset[1]))
+
+def simulate(mode="ai_vs_ai", seed=None, max_ticks=60 * 60 * 5, blue_ai=AIApproach1, red_ai=AIApproach2,
+             config=DEFAULT, teams=DEFAULT_TEAMS):
+    """Run one match headlessly and return its result.
+
+    Returns a dict with the winner (the team left standing, 'blue' or 'red'
+    outside battles; None when max_ticks ran out), the number of ticks
+    played, both tanks' final hp and rank (empty in a battle) and how many
+    tanks of each team survived.
+    """
+    match = Match(mode, seed=seed, blue_ai=blue_ai, red_ai=red_ai, config=config, teams=teams)
+    match.reset()
+    tanks = {tank.team: tank for tank in match.tanks} if mode != "battle" else {}
+    survivors = dict.fromkeys((tank.team for tank in match.tanks), 0)
+    while not match.game_over and match.tick < max_ticks:
+        match.step()
+    for tank in match.tanks:
+        survivors[tank.team] += 1
+    return {
+        'seed': match.seed,
+        'mode': mode,
+        'winner': match.winner,
+        'ticks': match.tick,
+        'hp': {color: max(0, tank.hp) for color, tank in tanks.items()},
+        'rank': {color: tank.rank for color, tank in tanks.items()},
+        'survivors': survivors,
+    }
+
+if __name__ == '__main__':
+    import sys
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print(simulate(seed=seed))
@@ -0,0 +1,101 @@
+from array import array
+
+class FreeCells:
+    """The map tiles no block, tank or bonus overlaps, for O(1) random placement.
+
+    Each tile counts the entities overlapping it. The tiles whose count is
+    zero are kept in a dense list with each tile's position in it, so a tile
+    joins or leaves the list by a swap with the last one, and a random free
+    tile is one randrange(). World keeps it up to date like the spatial hash
+    (insert, remove, and move() after a tank's rect changed), so building
+    the map and spawning bonuses need no rejection sampling against all
+    objects. The list's order depends on the order of those updates, so a
+    snapshot keeps it as is.
+    """
+    TRIES = 16  # random picks before sample() falls back to scanning for its region
+
+    def __init__(self, cols, rows, tile):
+        self.cols = cols
+        self.rows = rows
+        self.tile = tile
+        self.count = array('H', bytes(2 * cols * rows))
+        self.free = array('i', range(cols * rows))
+        self.pos = array('i', range(cols * rows))
+        self.tiles_of = {}
+
+    def __len__(self):
+        return len(self.free)
+
+    def _tiles(self, rect):
+        tile, cols = self.tile, self.cols
+        x, y, w, h = rect
+        left, top = max(0, x // tile), max(0, y // tile)
+        right, bottom = min(cols - 1, (x + w - 1) // tile), min(self.rows - 1, (y + h - 1) // tile)
+        if left == right and top == bottom:
+            return (top * cols + left,)
+        return tuple(row * cols + col for row in range(top, bottom + 1) for col in range(left, right + 1))
+
+    def insert(self, obj, tiles=None):
+        tiles = self._tiles(obj.rect) if tiles is None else tiles
+        self.tiles_of[obj] = tiles
+        count, free, pos = self.count, self.free, self.pos
+        for i in tiles:
+            if not count[i]:
+                # Swap-remove i from the free list
+                last = free.pop()
+                if last != i:
+                    free[pos[i]] = last
+                    pos[last] = pos[i]
+                pos[i] = -1
+            count[i] += 1
+
+    def remove(self, obj):
+        tiles = self.tiles_of.pop(obj, None)
+        if tiles is None:
+            return
+        count, free, pos = self.count, self.free, self.pos
+        for i in tiles:
+            count[i] -= 1
+            if not count[i]:
+                pos[i] = len(free)
+                free.append(i)
+
+    def move(self, obj):
+        tiles = self._tiles(obj.rect)
+        if self.tiles_of.get(obj) != tiles:
+            self.remove(obj)
+            self.insert(obj, tiles)
+
+    def is_free(self, col, row):
+        return self.count[row * self.cols + col] == 0
+
+    def sample(self, rng, cols=None, rows=None):
+        """A random free tile (col, row) with col in `cols` and row in `rows` (ranges), or None.
+
+        Picks uniformly among the free tiles of the region: a few random
+        free tiles are tried first, which is all it takes unless the region
+        holds only a small part of them; then the free list is scanned.
+        """
+        free, ncols = self.free, self.cols
+        if cols is None:
+            cols = range(ncols)
+        if rows is None:
+            rows = range(self.rows)
+        if not (free and cols and rows):
+            return None
+        for _ in range(self.TRIES):
+            i = free[rng.randrange(len(free))]
+            if i % ncols in cols and i // ncols in rows:
+                return i % ncols, i // ncols
+        region = [i for i in free if i % ncols in cols and i // ncols in rows]
+        if not region:
+            return None
+        i = region[rng.randrange(len(region))]
+        return i % ncols, i // ncols
+
+    def snapshot(self):
+        return self.count[:], self.free[:], self.pos[:], dict(self.tiles_of)
+
+    def restore(self, state):
+        count, free, pos, tiles_of = state
+        self.count, self.free, self.pos, self.tiles_of = count[:], free[:], pos[:], dict(tiles_of)
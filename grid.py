@@ -0,0 +1,72 @@
+def neighbors(i, cols, size):
+    """Indices of the tiles above, below, left and right of tile i, those on the map, in that order."""
+    c = i % cols
+    if cols <= i < size - cols and 0 < c < cols - 1:
+        return i - cols, i + cols, i - 1, i + 1
+    return tuple(j for j in (i - cols, i + cols, i - 1 if c else -1, i + 1 if c < cols - 1 else -1) if 0 <= j < size)
+
+class OccupancyGrid:
+    """Which map tiles are occupied by a block, one byte per tile.
+
+    Blocks register themselves on construction and clear their tile when
+    destroyed, so "is this tile blocked?" is a single bytearray lookup for the
+    AIs' pathfinding and for tank/block collisions. `version` increases on
+    every change, which lets callers cache anything derived from the map;
+    `changes` lists the index of every tile that changed, in order, so
+    incremental consumers (see planner.DStarLite) can catch up on just those.
+    """
+    def __init__(self, cols, rows, tile):
+        self.cols = cols
+        self.rows = rows
+        self.tile = tile
+        self.cells = bytearray(cols * rows)
+        self.version = 0
+        self.changes = []
+
+    def in_bounds(self, col, row):
+        return 0 <= col < self.cols and 0 <= row < self.rows
+
+    def is_blocked(self, col, row):
+        return self.cells[row * self.cols + col] != 0
+
+    def set_blocked(self, col, row, blocked=True):
+        index = row * self.cols + col
+        self.cells[index] = 1 if blocked else 0
+        self.changes.append(index)
+        self.version += 1
+
+    def snapshot(self):
+        return bytes(self.cells)
+
+    def restore(self, state):
+        """Return to a snapshot's map through set_blocked, so `changes` stays append-only.
+
+        The log grows by every tile put back; consumers catch up on those as on any change.
+        """
+        if self.cells == state:
+            return
+        cols = self.cols
+        for index, (now, then) in enumerate(zip(self.cells, state)):
+            if now != then:
+                self.set_blocked(index % cols, index // cols, bool(then))
+
+    def neighbors(self, i):
+        return neighbors(i, self.cols, len(self.cells))
+
+    def tile_at(self, x, y):
+        return int(x // self.tile), int(y // self.tile)
+
+    def rect_blocked(self, rect):
+        """True if any tile overlapped by rect holds a block."""
+        tile = self.tile
+        cols, cells = self.cols, self.cells
+        left = max(0, rect.left // tile)
+        right = min(cols - 1, (rect.right - 1) // tile)
+        top = max(0, rect.top // tile)
+        bottom = min(self.rows - 1, (rect.bottom - 1) // tile)
+        for row in range(top, bottom + 1):
+            base = row * cols
+            for col in range(left, right + 1):
+                if cells[base + col]:
+                    return True
+        return False
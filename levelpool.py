@@ -0,0 +1,60 @@
+"""Ready-made map layouts, generated in the background, for instant new games.
+
+A LevelPool keeps a few random layouts per kind of match (mode, map
+config, battle teams), each with the seed it was made from. take() hands
+one out and queues a replacement; Match(..., seed=seed, layout=layout) then
+builds its blocks straight from it, and plays exactly like a match that
+generated the layout itself (see Match.generate_layout()), so its replay
+still reproduces it.
+
+A layout only joins the pool if every tank can drive to every other
+round the bricks (TileMap.connected()); seeds whose map walls a tank in
+are skipped. Generation runs on one worker thread: a new game the pool
+has nothing ready for yet just generates as before.
+"""
+import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from engine import Match, DEFAULT_TEAMS
+
+SIZE = 2  # layouts kept ready per kind of match
+TRIES = 64  # seeds tried for a connected layout; a map that crowded takes the last one
+
+def generate_level(mode, config, teams, seed):
+    """(seed, layout) of the first seed from `seed` on whose layout every tank connects."""
+    for n in range(TRIES):
+        match = Match(mode, seed=(seed + n) % 2**32, config=config, teams=teams)
+        match.reset()
+        if match.tilemap.connected([match.grid.tile_at(*tank.rect.center) for tank in match.tanks]):
+            break
+    return match.seed, match.tilemap
+
+class LevelPool:
+    def __init__(self, size=SIZE):
+        self.size = size
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='levels')
+        self.ready = {}
+        self.rng = random.Random()
+
+    @staticmethod
+    def _key(mode, config, teams):
+        return mode, config.cols, config.rows, config.blocks, tuple(teams) if mode == "battle" else ()
+
+    def fill(self, mode, config, teams=DEFAULT_TEAMS):
+        """Queue layouts for this kind of match until `size` are ready or on their way."""
+        queue = self.ready.setdefault(self._key(mode, config, teams), deque())
+        while len(queue) < self.size:
+            queue.append(self.executor.submit(generate_level, mode, config, teams, self.rng.randrange(2**32)))
+
+    def take(self, mode, config, teams=DEFAULT_TEAMS):
+        """(seed, layout) for a new match, or None if none is ready yet."""
+        queue = self.ready.get(self._key(mode, config, teams))
+        level = None
+        if queue and queue[0].done():
+            level = queue.popleft().result()
+        self.fill(mode, config, teams)
+        return level
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
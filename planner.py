@@ -0,0 +1,211 @@
+import heapq
+
+INF = float('inf')
+PENDING = object()  # plan() ran out of its expansion budget; call again to continue
+
+def plan_path(world, planner, start, goal, fixed=False):
+    """Tile-centre waypoints from pixel start to goal, None if unreachable, or PENDING.
+
+    A fixed goal (a bonus, a hotspot, the centre) is reached down its shared
+    distance field (see fields.py); a moving one, or anything beyond the
+    field's radius, is searched for by planner. A goal walled off from
+    start is known unreachable without a search (see regions.py).
+    """
+    tile = world.grid.tile
+    start_tile = (int(start[0] // tile), int(start[1] // tile))
+    goal_tile = (int(goal[0] // tile), int(goal[1] // tile))
+    if not world.regions.reachable(start_tile, goal_tile):
+        return None
+    tiles = world.fields.get(goal_tile).path(start_tile) if fixed else None
+    if tiles is None:
+        tiles = planner.plan(start_tile, goal_tile)
+    if tiles is None or tiles is PENDING:
+        return tiles
+    return [(p[0] * tile + tile // 2, p[1] * tile + tile // 2) for p in tiles]
+
+def toward(tiles, goal_tile):
+    """A path searched for while its goal moved on to goal_tile, cut short where it passes it."""
+    if goal_tile in tiles:
+        return tiles[:tiles.index(goal_tile) + 1]
+    return tiles
+
+class DStarLite:
+    """Incremental 4-connected shortest paths over an OccupancyGrid (D* Lite).
+
+    The search runs backwards from the goal, so the tank moving along its path
+    only shifts the heuristic (the `km` offset) and destroyed blocks only
+    repair the part of the search tree they affect. Asking for a path again
+    after a collision, or on every tick, is therefore cheap. A new goal tile
+    starts a fresh search.
+
+    Moving into a blocked tile is forbidden; moving out of one is allowed,
+    matching the original A* (a tank may overlap a block at its start tile).
+
+    `budget` caps the vertex expansions one plan() call may spend (None: no
+    cap). A search that runs out returns PENDING and picks up where it left
+    off on the next call, so a long search on a large map is spread over
+    several ticks instead of stalling one. A goal that moves meanwhile (a
+    hunted tank) does not restart it, or it might never finish: the pending
+    search runs on to its own goal, and its path is cut short where it
+    passes the new goal (toward()), or else leads to where the goal was,
+    and the next plan() searches on from there. `expansions`
+    counts every expansion ever made, for callers that account for the work.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.goal = None
+        self.start = None
+        self.seen_changes = 0
+        self.pending = False
+        self.budget = None
+        self.expansions = 0
+
+    def plan(self, start_tile, goal_tile):
+        """Return the list of tiles from start_tile to goal_tile, None, or PENDING."""
+        grid = self.grid
+        if not (grid.in_bounds(*start_tile) and grid.in_bounds(*goal_tile)):
+            return None
+        if start_tile == goal_tile:
+            return [start_tile]
+        if grid.is_blocked(*goal_tile):
+            return None
+
+        cols = grid.cols
+        start = start_tile[1] * cols + start_tile[0]
+        goal = goal_tile[1] * cols + goal_tile[0]
+        if goal != self.goal and not (self.pending and not grid.cells[self.goal]):
+            self._reset(start, goal)
+        else:
+            if start != self.start:
+                self.km += self._h(self.start, start)
+                self.start = start
+            self._apply_changes()
+
+        self.pending = not self._compute(self.budget)
+        if self.pending:
+            return PENDING
+        if self.g[start] == INF:
+            return None if goal == self.goal else self.plan(start_tile, goal_tile)
+        tiles = self._extract(start, self.goal)
+        return toward(tiles, goal_tile) if tiles and goal != self.goal else tiles
+
+    def snapshot(self):
+        if self.goal is None:
+            return None
+        return (self.goal, self.start, self.seen_changes, self.km, self.pending,
+                self.g[:], self.rhs[:], self.open[:], dict(self.queued))
+
+    def restore(self, state):
+        """Rewind to a snapshot; map changes since are re-applied on the next plan()."""
+        if state is None:
+            self.goal = None
+            self.pending = False
+            return
+        self.goal, self.start, self.seen_changes, self.km, self.pending, g, rhs, open_, queued = state
+        self.g, self.rhs, self.open, self.queued = g[:], rhs[:], open_[:], dict(queued)
+
+    def _reset(self, start, goal):
+        size = self.grid.cols * self.grid.rows
+        self.g = [INF] * size
+        self.rhs = [INF] * size
+        self.open = []
+        self.queued = {}
+        self.km = 0
+        self.start = start
+        self.goal = goal
+        self.rhs[goal] = 0
+        self._push(goal)
+        self.seen_changes = len(self.grid.changes)
+
+    def _h(self, a, b):
+        cols = self.grid.cols
+        return abs(a % cols - b % cols) + abs(a // cols - b // cols)
+
+    def _key(self, s):
+        m = min(self.g[s], self.rhs[s])
+        return (m + self._h(self.start, s) + self.km, m)
+
+    def _push(self, s):
+        key = self._key(s)
+        self.queued[s] = key
+        heapq.heappush(self.open, (key, s))
+
+    def _neighbors(self, s):
+        cols, rows = self.grid.cols, self.grid.rows
+        col, row = s % cols, s // cols
+        if row > 0: yield s - cols
+        if col < cols - 1: yield s + 1
+        if row < rows - 1: yield s + cols
+        if col > 0: yield s - 1
+
+    def _update_vertex(self, u):
+        if u != self.goal:
+            cells, g = self.grid.cells, self.g
+            best = INF
+            for v in self._neighbors(u):
+                if not cells[v] and g[v] + 1 < best:
+                    best = g[v] + 1
+            self.rhs[u] = best
+        self.queued.pop(u, None)
+        if self.g[u] != self.rhs[u]:
+            self._push(u)
+
+    def _apply_changes(self):
+        changes = self.grid.changes
+        if self.seen_changes == len(changes):
+            return
+        for v in changes[self.seen_changes:]:
+            # Only edges into v changed cost; re-evaluate everything that can step into it.
+            for u in self._neighbors(v):
+                self._update_vertex(u)
+        self.seen_changes = len(changes)
+
+    def _compute(self, budget=None):
+        """Expand until the start is consistent; False if budget expansions ran out first."""
+        open_, queued, g, rhs = self.open, self.queued, self.g, self.rhs
+        start = self.start
+        expanded = 0
+        while open_:
+            key, u = open_[0]
+            if queued.get(u) != key:
+                heapq.heappop(open_)  # stale entry
+                continue
+            if not (key < self._key(start) or rhs[start] != g[start]):
+                break
+            if budget is not None and expanded >= budget:
+                self.expansions += expanded
+                return False
+            expanded += 1
+            heapq.heappop(open_)
+            del queued[u]
+            new_key = self._key(u)
+            if key < new_key:
+                self._push(u)
+            elif g[u] > rhs[u]:
+                g[u] = rhs[u]
+                for p in self._neighbors(u):
+                    self._update_vertex(p)
+            else:
+                g[u] = INF
+                for p in self._neighbors(u):
+                    self._update_vertex(p)
+                self._update_vertex(u)
+        self.expansions += expanded
+        return True
+
+    def _extract(self, start, goal):
+        cols, cells, g = self.grid.cols, self.grid.cells, self.g
+        path = [start]
+        s = start
+        for _ in range(len(g)):
+            if s == goal:
+                return [(p % cols, p // cols) for p in path]
+            best, best_g = None, INF
+            for v in self._neighbors(s):
+                if not cells[v] and g[v] < best_g:
+                    best, best_g = v, g[v]
+            if best is None:
+                return None
+            s = best
+            path.append(s)
+        return None
@@ -0,0 +1,100 @@
+"""Path planning off the simulation thread.
+
+A PlanningWorker runs searches on a thread (or process) pool against a
+compact snapshot of the occupancy grid: one byte per tile, shared by every
+request made while the map is unchanged. AsyncPlanner gives the AIs the
+same plan() interface as DStarLite: the first call submits a search and
+returns PENDING, so the tank keeps following its old path, and the result
+is handed over `latency` ticks later (more on larger maps, where a
+search can take longer).
+
+The hand-over tick is fixed rather than "whenever the thread is done", so
+matches stay deterministic (replays, seeded tournaments); the worker has
+those ticks, and the frame time the main loop spends waiting for vsync,
+to finish, and is only waited for if it has not. Blocks destroyed in the
+meantime only open shortcuts, so the result is still used then; a path
+that a tile blocked since (a snapshot restore) cuts is discarded and the
+search re-submitted.
+
+A goal that moves while its search is in flight does not restart it, for
+the reason a budgeted DStarLite's pending search is not restarted either
+(see there): the result arrives on its tick and is used the same way.
+"""
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from grid import OccupancyGrid
+from planner import DStarLite, PENDING, toward
+
+LATENCY = 4  # ticks between submitting a search and using its result, on the default map
+TILES_PER_TICK = 1024  # plus one tick per this many tiles: roughly what a frame's idle time searches
+
+def _plan_snapshot(cells, cols, rows, tile, start_tile, goal_tile):
+    grid = OccupancyGrid(cols, rows, tile)
+    grid.cells[:] = cells
+    return DStarLite(grid).plan(start_tile, goal_tile)
+
+class PlanningWorker:
+    def __init__(self, processes=False, workers=1):
+        pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self.executor = pool(max_workers=workers)
+        self.grid = None
+        self.version = None
+        self.cells = None
+
+    def submit(self, grid, start_tile, goal_tile):
+        """Start a search on a snapshot of grid; return (map version, snapshot, Future)."""
+        if grid is not self.grid or grid.version != self.version:
+            self.grid, self.version, self.cells = grid, grid.version, bytes(grid.cells)
+        future = self.executor.submit(_plan_snapshot, self.cells, grid.cols, grid.rows, grid.tile,
+                                      start_tile, goal_tile)
+        return self.version, self.cells, future
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+class AsyncPlanner:
+    """DStarLite's plan() interface, answered by a PlanningWorker `latency` ticks later."""
+    def __init__(self, world, worker, latency=None):
+        self.world = world
+        self.worker = worker
+        if latency is None:
+            latency = LATENCY + world.grid.cols * world.grid.rows // TILES_PER_TICK
+        self.latency = latency
+        self.request = None  # (start_tile, goal_tile, map version, map snapshot, due tick, future)
+        self.budget = None  # the AI scheduler's interface; the search work is off-thread
+        self.expansions = 0
+
+    def plan(self, start_tile, goal_tile):
+        """Return the tiles from start_tile to goal_tile, None, or PENDING while the worker searches."""
+        grid = self.world.grid
+        if not (grid.in_bounds(*start_tile) and grid.in_bounds(*goal_tile)):
+            return None
+        if start_tile == goal_tile:
+            return [start_tile]
+        if grid.is_blocked(*goal_tile):
+            return None
+
+        if self.request:
+            start, goal, version, cells, due, future = self.request
+            if self.world.tick < due:
+                return PENDING
+            tiles = future.result()
+            self.request = None
+            # A restore() bumps the version without necessarily changing the map
+            unchanged = version == grid.version or cells == grid.cells
+            if tiles is None:
+                if unchanged and goal == goal_tile:
+                    return None
+            elif start_tile in tiles:  # the tank usually is still on (or along) the old path
+                tiles = tiles[tiles.index(start_tile):]
+                if unchanged or not any(grid.is_blocked(*t) for t in tiles[1:]):
+                    return toward(tiles, goal_tile)
+        version, cells, future = self.worker.submit(grid, start_tile, goal_tile)
+        self.request = (start_tile, goal_tile, version, cells, self.world.tick + self.latency, future)
+        return PENDING
+
+    def snapshot(self):
+        return self.request
+
+    def restore(self, state):
+        self.request = state
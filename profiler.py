@@ -0,0 +1,77 @@
+"""Per-phase frame timings for finding where a frame's 16 ms go.
+
+The simulation and the front-end bracket their phases with start()/lap():
+each lap() charges the time since the previous call to a phase, and
+end_frame() files the frame's totals as one row of a fixed-size ring buffer.
+While disabled both return straight away, so the instrumentation can stay
+in the hot path. Laps within a frame accumulate, so a frame that runs
+several simulation ticks reports their sum.
+"""
+import csv
+import json
+import time
+
+import numpy as np
+
+PHASES = ('bullets', 'tanks', 'ai', 'objects', 'draw', 'flip')
+
+class FrameProfiler:
+    def __init__(self, phases=PHASES, capacity=600):
+        self.phases = phases
+        self.index = {name: i for i, name in enumerate(phases)}
+        self.samples = np.zeros((capacity, len(phases)))
+        self.current = [0.0] * len(phases)
+        self.frames = 0
+        self.enabled = False
+        self.t = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current = [0.0] * len(self.phases)
+
+    def start(self):
+        if self.enabled:
+            self.t = time.perf_counter()
+
+    def lap(self, phase):
+        if self.enabled:
+            now = time.perf_counter()
+            self.current[self.index[phase]] += now - self.t
+            self.t = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.samples[self.frames % len(self.samples)] = self.current
+        self.current = [0.0] * len(self.phases)
+        self.frames += 1
+
+    def recorded(self):
+        """The buffered frames, oldest first, in seconds."""
+        capacity = len(self.samples)
+        if self.frames <= capacity:
+            return self.samples[:self.frames]
+        return np.roll(self.samples, -(self.frames % capacity), axis=0)
+
+    def stats(self):
+        """{phase: (p50, p99)} in milliseconds over the buffered frames, plus 'total'."""
+        samples = self.recorded()
+        if not len(samples):
+            return {}
+        samples = np.column_stack((samples, samples.sum(axis=1))) * 1000.0
+        p50, p99 = np.percentile(samples, (50, 99), axis=0)
+        return {name: (p50[i], p99[i]) for i, name in enumerate((*self.phases, 'total'))}
+
+    def dump(self, path):
+        """Write the buffered frames (ms) to path, as JSON if it ends in .json, else CSV."""
+        samples = self.recorded() * 1000.0
+        if path.endswith('.json'):
+            summary = {name: {'p50': p50, 'p99': p99} for name, (p50, p99) in self.stats().items()}
+            with open(path, 'w') as f:
+                json.dump({'phases': list(self.phases), 'frames': self.frames, 'summary': summary,
+                           'samples_ms': samples.round(4).tolist()}, f, indent=1)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.phases)
+                writer.writerows(samples.round(4).tolist())
@@ -0,0 +1,168 @@
+"""Which parts of the map a tank can drive between, to turn away impossible goals at once.
+
+Regions is a union-find over the free tiles (4-connected, like the
+planner's moves): two tiles connect when their roots match, so a goal out
+of reach costs two find()s where a search would first visit every tile it
+can reach. Shooting a block can only merge regions, and union-find merges
+cheaply, so each opened tile in the grid's change log is joined to its
+free neighbours. Placing a block could split a region, which union-find
+cannot undo, so then the whole index is built again from each row's runs
+of free tiles.
+
+For a goal out of reach, gate() picks the block that, shot away, joins the
+tank's region to the goal's, and the free tile beside it to shoot from.
+"""
+from collections import deque
+
+class Regions:
+    def __init__(self, grid):
+        self.grid = grid
+        self.parent = None
+        self.size = None
+        self.seen_changes = None  # built on first use, once the map is in place
+        self.gates = {}
+
+    def _find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _union(self, a, b):
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def _build(self):
+        """Union-find from scratch: each row's runs of free tiles, joined to the runs above them."""
+        grid = self.grid
+        cols, cells = grid.cols, grid.cells
+        self.parent = parent = [-1] * len(cells)
+        self.size = [0] * len(cells)
+        above = []
+        for base in range(0, len(cells), cols):
+            runs = []
+            start = cells.find(0, base, base + cols)
+            while start >= 0:
+                end = cells.find(1, start, base + cols)
+                if end < 0:
+                    end = base + cols
+                parent[start:end] = [start] * (end - start)
+                self.size[start] = end - start
+                runs.append((start - base, end - base, start))
+                start = cells.find(0, end, base + cols)
+            k = 0
+            for first, last, rep in runs:
+                while k < len(above) and above[k][1] <= first:
+                    k += 1
+                j = k
+                while j < len(above) and above[j][0] < last:
+                    self._union(rep, above[j][2])
+                    j += 1
+            above = runs
+
+    def _open(self, i):
+        parent = self.parent
+        parent[i] = i
+        self.size[i] = 1
+        for j in self.grid.neighbors(i):
+            if parent[j] >= 0:  # a neighbour opened in the same batch joins when its turn comes
+                self._union(i, j)
+
+    def _sync(self):
+        grid = self.grid
+        if self.seen_changes == len(grid.changes):
+            return
+        if self.seen_changes is None or any(grid.cells[i] for i in grid.changes[self.seen_changes:]):
+            self._build()
+        else:
+            for i in grid.changes[self.seen_changes:]:
+                if self.parent[i] < 0:
+                    self._open(i)
+        self.seen_changes = len(grid.changes)
+        self.gates = {}
+
+    def _free_neighbor(self, i):
+        """Where a tank on blocked tile i drives out to (see planner.DStarLite), or None."""
+        cells = self.grid.cells
+        return next((j for j in self.grid.neighbors(i) if not cells[j]), None)
+
+    def region(self, tile):
+        """The root of the region a tank on tile can drive in, or None.
+
+        For a tank on a block's tile that is the region of its first free neighbour.
+        """
+        self._sync()
+        grid = self.grid
+        col, row = tile
+        cols, cells = grid.cols, grid.cells
+        if not (0 <= col < cols and 0 <= row < grid.rows):
+            return None
+        i = row * cols + col
+        if not cells[i]:
+            root = self.parent[i]
+            return root if self.parent[root] == root else self._find(i)
+        i = self._free_neighbor(i)
+        return None if i is None else self._find(i)
+
+    def reachable(self, start, goal):
+        """True if a tank on start can drive to the free tile goal."""
+        grid = self.grid
+        if not grid.in_bounds(*goal) or grid.is_blocked(*goal):
+            return False
+        here = self.region(start)
+        return here is not None and here == self.region(goal)
+
+    def gate(self, start, goal):
+        """((col, row) of a block, (col, row) to shoot it from), or None.
+
+        The block is the one nearest start whose destruction lets start reach
+        goal; the tile is its free neighbour in start's region nearest start.
+        None if start can reach goal already, or no single block joins them.
+        """
+        here, there = self.region(start), self.region(goal)
+        if here is None or there is None or here == there:
+            return None
+        key = (here, there)
+        if key not in self.gates:
+            self.gates[key] = self._gates(start, goal, here, there)
+        cols = self.grid.cols
+        def nearest(tiles):
+            return min(tiles, default=None, key=lambda i: (abs(i % cols - start[0]) + abs(i // cols - start[1]), i))
+        best = nearest(self.gates[key])
+        if best is None:
+            return None
+        cells = self.grid.cells
+        side = nearest(j for j in self.grid.neighbors(best) if not cells[j] and self._find(j) == here)
+        return (best % cols, best // cols), (side % cols, side // cols)
+
+    def _gates(self, start, goal, here, there):
+        """Every block tile bordering both regions, found by flooding the smaller one."""
+        grid = self.grid
+        cols, cells, neighbors = grid.cols, grid.cells, grid.neighbors
+        if self.size[there] <= self.size[here]:
+            origin, other = goal, here
+        else:
+            origin, other = start, there
+        i = origin[1] * cols + origin[0]
+        if cells[i]:  # flood from the neighbour region() chose
+            i = self._free_neighbor(i)
+        seen = {i}
+        queue = deque([i])
+        gates = set()
+        while queue:
+            for j in neighbors(queue.popleft()):
+                if j in seen:
+                    continue
+                if not cells[j]:
+                    seen.add(j)
+                    queue.append(j)
+                elif j not in gates:
+                    if any(not cells[k] and self._find(k) == other for k in neighbors(j)):
+                        gates.add(j)
+        return gates
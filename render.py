@@ -0,0 +1,161 @@
+from collections import OrderedDict
+
+import pygame
+
+class TextCache:
+    """Rendered text Surfaces keyed by (font, text, colour), with LRU eviction.
+
+    HUD values and menu labels repeat from frame to frame, so after the first
+    frame showing them no font rasterization happens at all. The bound keeps
+    memory flat when values keep changing (hp, rank, ...).
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surf = self.entries.get(key)
+        if surf is None:
+            surf = font.render(text, True, color)
+            self.entries[key] = surf
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        return surf
+
+class TerrainLayer:
+    """The background and every block as seen through the camera, in one Surface.
+
+    The map is pre-rendered in square chunks, built when first scrolled into
+    view and kept in a bounded LRU, so even a 256x256-tile map costs a few
+    chunk blits per camera move and no more memory than a few screens.
+    sync() patches only the tiles listed in the grid's change log since the
+    last call, so a block being destroyed costs one tile redraw, and while
+    the camera stays put the frame itself is a single blit (or a few partial
+    ones, see DirtyRenderer).
+    """
+    def __init__(self, size, background, block_image, chunk_tiles=16, max_chunks=48):
+        self.surface = pygame.Surface(size)
+        self.background = background
+        self.block_image = block_image
+        self.chunk_tiles = chunk_tiles
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+        self.grid = None
+        self.seen = 0
+        self.camera = None
+
+    def _build_chunk(self, key):
+        grid, n, t = self.grid, self.chunk_tiles, self.grid.tile
+        chunk = pygame.Surface((n * t, n * t))
+        chunk.fill(self.background)
+        cols, cells = grid.cols, grid.cells
+        for row in range(key[1] * n, min(grid.rows, key[1] * n + n)):
+            for col in range(key[0] * n, min(cols, key[0] * n + n)):
+                if cells[row * cols + col]:
+                    chunk.blit(self.block_image, ((col - key[0] * n) * t, (row - key[1] * n) * t))
+        return chunk
+
+    def _chunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = self._build_chunk(key)
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def _patch(self, index):
+        """Redraw one tile in its chunk (if built); return the tile's rect in map coordinates."""
+        grid, n = self.grid, self.chunk_tiles
+        t = grid.tile
+        col, row = index % grid.cols, index // grid.cols
+        chunk = self.chunks.get((col // n, row // n))
+        if chunk is not None:
+            local = pygame.Rect(col % n * t, row % n * t, t, t)
+            chunk.fill(self.background, local)
+            if grid.cells[index]:
+                chunk.blit(self.block_image, local)
+        return pygame.Rect(col * t, row * t, t, t)
+
+    def _compose(self, area=None):
+        """Redraw area (view coordinates, default everything) from the chunks."""
+        grid = self.grid
+        span = self.chunk_tiles * grid.tile
+        cx, cy = self.camera
+        view = self.surface.get_rect() if area is None else area
+        self.surface.set_clip(view)
+        self.surface.fill(self.background)
+        last_x = min((grid.cols - 1) // self.chunk_tiles, (cx + view.right - 1) // span)
+        last_y = min((grid.rows - 1) // self.chunk_tiles, (cy + view.bottom - 1) // span)
+        for ky in range(max(0, (cy + view.top) // span), last_y + 1):
+            for kx in range(max(0, (cx + view.left) // span), last_x + 1):
+                self.surface.blit(self._chunk((kx, ky)), (kx * span - cx, ky * span - cy))
+        self.surface.set_clip(None)
+
+    def sync(self, grid, camera=(0, 0)):
+        """Catch up with grid and the camera (the view's top-left corner on the map).
+
+        Returns the view rects that changed, or None after a full redraw.
+        """
+        if grid is not self.grid:
+            self.grid = grid
+            self.chunks.clear()
+            self.seen = len(grid.changes)
+            self.camera = None
+        changes = grid.changes
+        touched = [self._patch(index) for index in changes[self.seen:]]
+        self.seen = len(changes)
+        if camera != self.camera:
+            self.camera = camera
+            self._compose()
+            return None
+        view = self.surface.get_rect()
+        changed = [rect for rect in (r.move(-camera[0], -camera[1]) for r in touched) if rect.colliderect(view)]
+        for rect in changed:
+            self._compose(rect)
+        return changed
+
+class DirtyRenderer:
+    """Pushes only the screen regions that changed to the display.
+
+    Everything drawn this frame is mark()ed; the next frame first restores
+    the background under those rects (erase) and flush() updates both the old
+    and the new rects. invalidate() forces one full-window update, e.g. after
+    a menu was shown or a new map was built.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.previous = []
+        self.current = []
+        self.full = True
+
+    def invalidate(self):
+        self.full = True
+
+    def mark(self, rect):
+        if rect:
+            self.current.append(rect)
+
+    def mark_all(self, rects):
+        self.current.extend(r for r in rects if r)
+
+    def erase(self, background):
+        """Restore background under last frame's drawings (or everywhere)."""
+        if self.full:
+            self.window.blit(background, (0, 0))
+        else:
+            for rect in self.previous:
+                self.window.blit(background, rect, rect)
+
+    def flush(self):
+        if self.full:
+            pygame.display.update()
+            self.full = False
+        else:
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
+        self.current = []
@@ -0,0 +1,132 @@
+"""Compact match replays: the seed plus the human players' inputs.
+
+A match is fully determined by its seed, its map config and the keys the
+human tanks saw each tick (see engine.Match), so a replay stores only that:
+five bits per human tank per tick (left, right, up, down, shoot),
+zlib-compressed, plus a 16-bit state hash per tick. A flag records whether
+the AIs planned on a planning worker, which changes when their paths arrive,
+and a battle's team sizes follow the header, then the layout of a match
+that was given one (a tilemap.TileMap). play_replay() re-simulates the
+match at full speed and checks every tick's hash, so any change that
+breaks determinism is caught at the first tick it diverges.
+
+    python replay.py replays/<file>.ttr
+"""
+import struct
+import sys
+import zlib
+from array import array
+from collections import defaultdict
+
+from engine import Match, MODES
+from config import WorldConfig
+from planner_worker import PlanningWorker
+from tilemap import TileMap
+
+MAGIC = b'TTRP'
+VERSION = 5
+HEADER = struct.Struct('<4sBBQIIHHIB')  # magic, version, mode, seed, ticks, players, cols, rows, blocks, flags
+FLAG_PLANNING_WORKER = 1
+FLAG_LAYOUT = 2  # the match's zlib-compressed TileMap cells follow the team sizes
+
+class ReplayDesync(Exception):
+    pass
+
+def _key_codes(tank):
+    return (tank.keyLEFT, tank.keyRIGHT, tank.keyUP, tank.keyDOWN, tank.keySHOT)
+
+def _human_tanks(match):
+    return [tank for tank in match.tanks if not tank.ai_controlled]
+
+def _keys_from_bits(players, bits):
+    keys = defaultdict(bool)
+    for codes, b in zip(players, bits):
+        for i, code in enumerate(codes):
+            if b >> i & 1:
+                keys[code] = True
+    return keys
+
+class ReplayRecorder:
+    """Drives a freshly reset match one tick at a time and records it.
+
+    step(keys) replaces match.step(): the human tanks' keys are reduced to
+    their five bits and the match is stepped on exactly those, so the live
+    match and its replay see identical input.
+    """
+    def __init__(self, match):
+        self.match = match
+        self.players = [_key_codes(tank) for tank in _human_tanks(match)]
+        self.inputs = bytearray()
+        self.hashes = array('H')
+
+    def step(self, keys):
+        bits = [sum(1 << i for i, code in enumerate(codes) if keys[code]) for codes in self.players]
+        self.inputs.extend(bits)
+        self.match.keys = _keys_from_bits(self.players, bits)
+        self.match.step()
+        self.hashes.append(self.match.state_hash() & 0xFFFF)
+
+    def save(self, path):
+        match, config = self.match, self.match.config
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, MODES.index(match.mode), match.seed,
+                                len(self.hashes), len(self.players), config.cols, config.rows, config.blocks,
+                                (FLAG_PLANNING_WORKER if match.planning_worker else 0) |
+                                (FLAG_LAYOUT if match.layout else 0)))
+            f.write(struct.pack(f'<B{len(match.teams)}H', len(match.teams), *match.teams))
+            if match.layout:
+                data = zlib.compress(match.layout.cells, 9)
+                f.write(struct.pack('<I', len(data)))
+                f.write(data)
+            data = zlib.compress(bytes(self.inputs), 9)
+            f.write(struct.pack('<I', len(data)))
+            f.write(data)
+            hashes = array('H', self.hashes)
+            if sys.byteorder != 'little':
+                hashes.byteswap()
+            f.write(hashes.tobytes())
+
+def load_replay(path):
+    """Return (mode, seed, config, teams, layout, flags, inputs, hashes) from a replay file."""
+    with open(path, 'rb') as f:
+        magic, version, mode, seed, ticks, players, cols, rows, blocks, flags = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} replay")
+        n, = f.read(1)
+        teams = struct.unpack(f'<{n}H', f.read(2 * n))
+        layout = None
+        if flags & FLAG_LAYOUT:
+            size, = struct.unpack('<I', f.read(4))
+            layout = TileMap(cols, rows, zlib.decompress(f.read(size)))
+        size, = struct.unpack('<I', f.read(4))
+        inputs = zlib.decompress(f.read(size))
+        hashes = array('H')
+        hashes.frombytes(f.read(2 * ticks))
+        if sys.byteorder != 'little':
+            hashes.byteswap()
+    if len(inputs) != ticks * players or len(hashes) != ticks:
+        raise ValueError(f"{path}: truncated replay")
+    return MODES[mode], seed, WorldConfig(cols, rows, blocks), teams, layout, flags, [inputs[i * players:(i + 1) * players] for i in range(ticks)], hashes
+
+def play_replay(path):
+    """Re-simulate a replay, checking every tick; return the finished Match."""
+    mode, seed, config, teams, layout, flags, inputs, hashes = load_replay(path)
+    worker = PlanningWorker() if flags & FLAG_PLANNING_WORKER else None
+    match = Match(mode, seed=seed, config=config, planning_worker=worker, teams=teams, layout=layout)
+    match.reset()
+    players = [_key_codes(tank) for tank in _human_tanks(match)]
+    try:
+        for tick, (bits, expected) in enumerate(zip(inputs, hashes)):
+            match.keys = _keys_from_bits(players, bits)
+            match.step()
+            if match.state_hash() & 0xFFFF != expected:
+                raise ReplayDesync(f"{path}: desync at tick {tick + 1}")
+    finally:
+        if worker:
+            worker.shutdown()
+    return match
+
+if __name__ == '__main__':
+    for path in sys.argv[1:]:
+        match = play_replay(path)
+        print(f"{path}: {match.mode}, seed {match.seed}, {match.tick} ticks, winner {match.winner}, OK")
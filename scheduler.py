@@ -0,0 +1,65 @@
+"""Per-tick time budget for the AI tanks' thinking.
+
+Each AI is split into think() (perception, target choice, path planning)
+and steer() (follow the current path, collide, fire). Every tick every AI
+steers, and the budget pays for that first (it adds up in a battle of dozens
+of tanks); then only as many think as the rest allows, the ones that went
+longest without thinking first; the others keep steering on their last plan.
+Whatever budget the thinkers' base costs leave is shared out as D* Lite
+expansions, so a long search on a large map continues over several ticks
+(see planner.PENDING) instead of stalling one. The AI tick cost therefore
+stays flat however many AI tanks there are.
+
+Costs are not measured but estimated from work counts (each AI class's
+STEER_COST_US and THINK_COST_US, plus EXPANSION_COST_US per expansion,
+calibrated on a desktop CPU), so the schedule, and with it every match and
+replay, is deterministic.
+"""
+EXPANSION_COST_US = 15
+MIN_SLICE = 32  # expansions a thinking AI gets even when the budget is spent
+
+class AIScheduler:
+    def __init__(self, budget_us=4000):
+        """budget_us: estimated AI thinking time per tick; None thinks every AI every tick."""
+        self.budget_us = budget_us
+        self.tick = 0
+        self.last_think = {}
+        self.slices = {}
+        self.spent_us = 0
+
+    def begin_tick(self, agents):
+        """Decide which of agents (in update order) think this tick."""
+        self.tick += 1
+        self.spent_us = 0
+        if self.budget_us is None:
+            self.slices = dict.fromkeys(agents)
+            return
+        remaining = self.budget_us - sum(agent.STEER_COST_US for agent in agents)
+        granted = []
+        for agent in sorted(agents, key=lambda a: self.last_think.get(a, -1)):
+            if granted and agent.THINK_COST_US > remaining:
+                continue
+            granted.append(agent)
+            remaining -= agent.THINK_COST_US
+        expansions = max(MIN_SLICE, remaining // EXPANSION_COST_US // max(1, len(granted)))
+        self.slices = dict.fromkeys(granted, expansions)
+
+    def run(self, agent):
+        """One tick of agent: think if granted, then steer."""
+        if agent in self.slices:
+            planner = agent.planner
+            planner.budget = self.slices[agent]
+            before = planner.expansions
+            agent.think()
+            planner.budget = None
+            self.spent_us += agent.THINK_COST_US + (planner.expansions - before) * EXPANSION_COST_US
+            self.last_think[agent] = self.tick
+        agent.steer()
+        self.spent_us += agent.STEER_COST_US
+
+    def snapshot(self):
+        return self.tick, dict(self.last_think)
+
+    def restore(self, state):
+        tick, last_think = state
+        self.tick, self.last_think = tick, dict(last_think)
@@ -0,0 +1,77 @@
+class SpatialHash:
+    """Uniform-grid broad phase over objects that have a `rect`.
+
+    Each object is filed under every cell its rect overlaps. Entities insert
+    themselves when created, call move() after their rect changes and
+    remove() when they leave the match, so collision code only looks at the
+    handful of objects near a point or rect instead of the whole match.
+    Buckets are insertion-ordered dicts, which keeps query order (and hence
+    the simulation) deterministic.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.buckets = {}
+        self.cells_of = {}
+
+    def _cells(self, rect):
+        cs = self.cell_size
+        x0, x1 = rect.left // cs, (rect.right - 1) // cs
+        y0, y1 = rect.top // cs, (rect.bottom - 1) // cs
+        if x0 == x1 and y0 == y1:
+            return ((x0, y0),)
+        return tuple((cx, cy) for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1))
+
+    def insert(self, obj, cells=None):
+        cells = cells or self._cells(obj.rect)
+        self.cells_of[obj] = cells
+        buckets = self.buckets
+        for cell in cells:
+            bucket = buckets.get(cell)
+            if bucket is None:
+                buckets[cell] = {obj: None}
+            else:
+                bucket[obj] = None
+
+    def remove(self, obj):
+        cells = self.cells_of.pop(obj, None)
+        if cells is None:
+            return
+        buckets = self.buckets
+        for cell in cells:
+            bucket = buckets[cell]
+            del bucket[obj]
+            if not bucket:
+                del buckets[cell]
+
+    def move(self, obj):
+        cells = self._cells(obj.rect)
+        if self.cells_of.get(obj) != cells:
+            self.remove(obj)
+            self.insert(obj, cells)
+
+    def snapshot(self):
+        return {cell: dict(bucket) for cell, bucket in self.buckets.items()}, dict(self.cells_of)
+
+    def restore(self, state):
+        buckets, cells_of = state
+        self.buckets = {cell: dict(bucket) for cell, bucket in buckets.items()}
+        self.cells_of = dict(cells_of)
+
+    def query_point(self, x, y):
+        cs = self.cell_size
+        bucket = self.buckets.get((int(x) // cs, int(y) // cs))
+        return list(bucket) if bucket else []
+
+    def query_rect(self, rect):
+        """Objects filed in any cell rect overlaps (a superset of those colliding with it)."""
+        buckets = self.buckets
+        cells = self._cells(rect)
+        if len(cells) == 1:
+            bucket = buckets.get(cells[0])
+            return list(bucket) if bucket else []
+        found = {}
+        for cell in cells:
+            bucket = buckets.get(cell)
+            if bucket:
+                found.update(bucket)
+        return list(found)
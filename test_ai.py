@@ -0,0 +1,62 @@
+"""The AIs' think() on maps where a path search cannot answer at once.
+
+    python -m pytest test_ai.py
+"""
+import os
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from config import TILE
+from engine import Match
+from fields import RADIUS
+from planner import PENDING
+from planner_worker import PlanningWorker
+from tilemap import TileMap, BRICK
+
+COLS, ROWS, WALL = 120, 10, 60
+
+def walled_match(planning_worker=None):
+    """ai_vs_ai across a map cut in two by a brick column, red's gate far past the field radius."""
+    cells = bytearray(COLS * ROWS)
+    for row in range(ROWS):
+        cells[row * COLS + WALL] = BRICK
+    match = Match("ai_vs_ai", seed=1, layout=TileMap(COLS, ROWS, cells), planning_worker=planning_worker)
+    match.reset()
+    ai = next(tank.ai_approach for tank in match.tanks if tank.color == 'red')
+    ai.choose_strategic_target = lambda enemy, bonuses: None
+    ai.target, ai.target_type = (2 * TILE + TILE // 2, 5 * TILE + TILE // 2), 'hotspot'
+    return match, ai
+
+class GateTest(unittest.TestCase):
+    def check_pending(self, match, ai):
+        grid = match.grid
+        start = grid.tile_at(ai.tank.rect.centerx, ai.tank.rect.centery)
+        gate = match.regions.gate(start, grid.tile_at(*ai.target))
+        self.assertIsNotNone(gate)
+        self.assertGreater(abs(gate[1][0] - start[0]) + abs(gate[1][1] - start[1]), RADIUS)
+        ai.path = []
+        ai.think()  # the gate's search has not finished: no path yet, and no crash
+        self.assertEqual(ai.gate, gate[0])
+        self.assertIsNot(ai.path, PENDING)
+        self.assertEqual(ai.path, [])
+
+    def test_budgeted_planner(self):
+        match, ai = walled_match()
+        ai.planner.budget = 1
+        self.check_pending(match, ai)
+        ai.planner.budget = None
+        ai.think()
+        self.assertEqual(ai.path[-1], (WALL * TILE + TILE // 2, ai.path[-2][1]))
+
+    def test_async_planner(self):
+        worker = PlanningWorker()
+        try:
+            match, ai = walled_match(worker)
+            self.check_pending(match, ai)
+        finally:
+            worker.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""planner.DStarLite against a breadth-first search on the same grid.
+
+Every path must be a chain of free, 4-adjacent tiles from the start (which
+may be blocked: a tank can drive out of a block it overlaps) and as short
+as the breadth-first one, or None exactly when that finds none, however the
+search got there: from scratch, incrementally after blocks opened, spread
+over several calls by a budget, or with its goal moved while it was pending.
+
+    python -m pytest test_planner.py
+"""
+import random
+import unittest
+from collections import deque
+
+from config import TILE
+from grid import OccupancyGrid
+from planner import DStarLite, PENDING
+
+def reference_distance(grid, start, goal):
+    """Tiles on a shortest path from start to goal, or None."""
+    if start == goal:
+        return 1
+    if grid.is_blocked(*goal):
+        return None
+    dist = {start: 1}
+    queue = deque([start])
+    while queue:
+        col, row = tile = queue.popleft()
+        for step in ((col, row - 1), (col + 1, row), (col, row + 1), (col - 1, row)):
+            if grid.in_bounds(*step) and not grid.is_blocked(*step) and step not in dist:
+                dist[step] = dist[tile] + 1
+                if step == goal:
+                    return dist[step]
+                queue.append(step)
+    return None
+
+def random_grid(rng, cols, rows, density):
+    grid = OccupancyGrid(cols, rows, TILE)
+    for index in rng.sample(range(cols * rows), int(cols * rows * density)):
+        grid.set_blocked(index % cols, index // cols)
+    return grid
+
+def random_tile(rng, grid):
+    return rng.randrange(grid.cols), rng.randrange(grid.rows)
+
+def open_some(rng, grid, n):
+    for _ in range(n):
+        grid.set_blocked(*random_tile(rng, grid), False)
+
+def finish(planner, start, goal):
+    """plan() called until it stops returning PENDING."""
+    path = planner.plan(start, goal)
+    while path is PENDING:
+        path = planner.plan(start, goal)
+    return path
+
+class DStarLiteTest(unittest.TestCase):
+    def check(self, grid, path, start, goal):
+        expected = reference_distance(grid, start, goal)
+        if expected is None:
+            self.assertIsNone(path, (start, goal))
+            return
+        self.assertIsNotNone(path, (start, goal))
+        self.assertEqual((path[0], path[-1]), (start, goal))
+        for a, b in zip(path, path[1:]):
+            self.assertEqual(abs(a[0] - b[0]) + abs(a[1] - b[1]), 1, path)
+            self.assertFalse(grid.is_blocked(*b), path)
+        self.assertEqual(len(path), expected, (start, goal))
+
+    def test_random_grids(self):
+        rng = random.Random(1234)
+        for _ in range(40):
+            grid = random_grid(rng, rng.randint(2, 30), rng.randint(2, 20), rng.uniform(0, 0.45))
+            for _ in range(20):
+                start, goal = random_tile(rng, grid), random_tile(rng, grid)
+                self.check(grid, DStarLite(grid).plan(start, goal), start, goal)
+
+    def test_incremental(self):
+        """One planner following its path while blocks open and, now and then, the goal moves."""
+        rng = random.Random(5678)
+        for _ in range(60):
+            grid = random_grid(rng, 20, 15, rng.uniform(0.1, 0.5))
+            planner = DStarLite(grid)
+            start, goal = random_tile(rng, grid), random_tile(rng, grid)
+            for _ in range(25):
+                if rng.random() < 0.3:
+                    open_some(rng, grid, rng.randint(1, 3))
+                if rng.random() < 0.1:
+                    goal = random_tile(rng, grid)
+                path = planner.plan(start, goal)
+                self.check(grid, path, start, goal)
+                if path and len(path) > 1 and rng.random() < 0.7:
+                    start = path[1]
+                elif rng.random() < 0.2:
+                    start = random_tile(rng, grid)
+
+    def test_budget(self):
+        """A budgeted search resumes where it stopped, including after blocks opened in between."""
+        rng = random.Random(91011)
+        resumed = 0
+        for _ in range(60):
+            grid = random_grid(rng, 40, 30, rng.uniform(0.1, 0.4))
+            planner = DStarLite(grid)
+            planner.budget = rng.choice((1, 8, 32))
+            start, goal = random_tile(rng, grid), random_tile(rng, grid)
+            path = planner.plan(start, goal)
+            while path is PENDING:
+                resumed += 1
+                if rng.random() < 0.1:
+                    open_some(rng, grid, 1)
+                path = planner.plan(start, goal)
+            self.check(grid, path, start, goal)
+        self.assertGreater(resumed, 0)
+
+    def test_goal_moves_while_pending(self):
+        """The pending search runs on to its own goal, cut short where it passes the new one."""
+        rng = random.Random(121314)
+        outcomes = set()
+        for _ in range(100):
+            grid = random_grid(rng, 40, 30, rng.uniform(0.05, 0.3))
+            planner = DStarLite(grid)
+            planner.budget = 16
+            start, old_goal = random_tile(rng, grid), random_tile(rng, grid)
+            if planner.plan(start, old_goal) is not PENDING:
+                continue
+            # The hunted tank comes closer, along the way to it, or goes anywhere
+            old_path = DStarLite(grid).plan(start, old_goal)
+            if old_path and len(old_path) > 2 and rng.random() < 0.5:
+                goal = rng.choice(old_path[1:-1])
+            else:
+                goal = random_tile(rng, grid)
+            path = finish(planner, start, goal)
+            if path and path[-1] != goal:  # leads to where the goal was
+                self.assertNotIn(goal, path)
+                self.check(grid, path, start, old_goal)
+                outcomes.add('old goal')
+            else:
+                self.check(grid, path, start, goal)
+                outcomes.add('cut short' if path and planner.goal != goal[1] * grid.cols + goal[0] else 'new goal')
+            # The next search is for the new goal itself
+            self.check(grid, finish(planner, start, goal), start, goal)
+        self.assertIn('old goal', outcomes)
+        self.assertIn('cut short', outcomes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""visibility.py against the per-pixel line of sight the AIs used before it.
+
+The reference functions below are the originals (one sample per pixel, every
+block's rect tested at each sample); the grid-walking versions must agree
+with them exactly, corner clips and degenerate segments included.
+
+    python -m pytest test_visibility.py
+"""
+import random
+import unittest
+
+import pygame
+
+from config import TILE
+from grid import OccupancyGrid
+from visibility import count_blocks_in_path, has_line_of_sight, walk_tiles
+
+def reference_count_blocks_in_path(pos1, pos2, blocks):
+    x1, y1 = pos1
+    x2, y2 = pos2
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = max(abs(dx), abs(dy))
+    if steps == 0:
+        return 0
+    block_set = set()
+    for i in range(1, int(steps)):
+        t = i / steps
+        x = x1 + dx * t
+        y = y1 + dy * t
+        for block in blocks:
+            if block.collidepoint(x, y):
+                block_set.add(id(block))
+                break
+    return len(block_set)
+
+def reference_has_line_of_sight(pos1, pos2, blocks):
+    x1, y1 = pos1
+    x2, y2 = pos2
+    steps = max(abs(x2 - x1), abs(y2 - y1))
+    if steps == 0:
+        return True
+    for i in range(1, int(steps)):
+        t = i / steps
+        x = x1 + (x2 - x1) * t
+        y = y1 + (y2 - y1) * t
+        for block in blocks:
+            if block.collidepoint(x, y):
+                return False
+    return True
+
+def reference_walk_tiles(pos1, pos2, tile):
+    x1, y1 = pos1
+    x2, y2 = pos2
+    steps = max(abs(x2 - x1), abs(y2 - y1))
+    tiles = []
+    if steps == 0:
+        return tiles
+    for i in range(1, int(steps)):
+        t = i / steps
+        here = int(x1 + (x2 - x1) * t) // tile, int(y1 + (y2 - y1) * t) // tile
+        if not tiles or tiles[-1] != here:
+            tiles.append(here)
+    return tiles
+
+def random_map(rng, cols, rows, density):
+    grid = OccupancyGrid(cols, rows, TILE)
+    blocks = []
+    for index in rng.sample(range(cols * rows), int(cols * rows * density)):
+        col, row = index % cols, index // cols
+        grid.set_blocked(col, row)
+        blocks.append(pygame.Rect(col * TILE, row * TILE, TILE, TILE))
+    return grid, blocks
+
+class VisibilityTest(unittest.TestCase):
+    def check(self, pos1, pos2, grid, blocks):
+        expected = reference_count_blocks_in_path(pos1, pos2, blocks)
+        self.assertEqual(count_blocks_in_path(pos1, pos2, grid), expected, (pos1, pos2))
+        self.assertEqual(count_blocks_in_path(pos1, pos2, grid, limit=2), min(expected, 2), (pos1, pos2))
+        self.assertEqual(has_line_of_sight(pos1, pos2, grid), reference_has_line_of_sight(pos1, pos2, blocks),
+                         (pos1, pos2))
+        self.assertEqual(list(walk_tiles(pos1, pos2, TILE)), reference_walk_tiles(pos1, pos2, TILE), (pos1, pos2))
+
+    def test_random_segments(self):
+        rng = random.Random(1234)
+        for _ in range(20):
+            cols, rows = rng.randint(4, 30), rng.randint(4, 20)
+            grid, blocks = random_map(rng, cols, rows, rng.uniform(0.05, 0.5))
+            w, h = cols * TILE, rows * TILE
+            for _ in range(100):
+                self.check((rng.randrange(w), rng.randrange(h)), (rng.randrange(w), rng.randrange(h)), grid, blocks)
+
+    def test_corner_clipping(self):
+        """Diagonals through and right beside tile corners, where a walk could cut or miss a block."""
+        rng = random.Random(5678)
+        grid, blocks = random_map(rng, 12, 12, 0.4)
+        for _ in range(500):
+            col, row = rng.randrange(1, 11), rng.randrange(1, 11)
+            corner = (col * TILE + rng.choice((-1, 0, 1)), row * TILE + rng.choice((-1, 0, 1)))
+            span = rng.randint(1, 5) * TILE + rng.choice((-1, 0, 1))
+            for sx, sy in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+                end = (min(max(corner[0] + sx * span, 0), 12 * TILE - 1),
+                       min(max(corner[1] + sy * span, 0), 12 * TILE - 1))
+                self.check(corner, end, grid, blocks)
+                self.check(end, corner, grid, blocks)
+
+    def test_short_segments(self):
+        """Zero-, one- and two-step segments have no or a single sample in between."""
+        rng = random.Random(91011)
+        grid, blocks = random_map(rng, 8, 8, 0.5)
+        for _ in range(300):
+            pos = (rng.randrange(1, 8 * TILE - 2), rng.randrange(1, 8 * TILE - 2))
+            for dx, dy in ((0, 0), (1, 0), (0, 1), (-1, -1), (1, -1), (2, 0), (2, 1), (-2, 2)):
+                self.check(pos, (pos[0] + dx, pos[1] + dy), grid, blocks)
+
+if __name__ == '__main__':
+    unittest.main()
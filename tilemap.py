@@ -0,0 +1,89 @@
+"""Map layouts as files: a fixed header, then one byte per tile.
+
+A .ttm file is a 16-byte header (magic, version, cols, rows, block count)
+followed by cols * rows bytes, row by row: FLOOR or BRICK. The body is laid
+out exactly like OccupancyGrid.cells, so load() maps the file and takes the
+body in one slice, and a Match given the TileMap builds its blocks straight
+from it (see Match.reset()) instead of placing them at random.
+
+A match's random layout depends only on its mode, seed and map config (see
+Match.generate_layout()), so layouts made ahead of time are the very ones
+reset() would make; see levelpool.py.
+"""
+import mmap
+import struct
+from collections import deque
+
+from config import WorldConfig
+from grid import neighbors
+
+MAGIC = b'TTMP'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xHHI')  # magic, version, (padding), cols, rows, blocks
+FLOOR, BRICK = 0, 1
+
+class TileMap:
+    __slots__ = ('cols', 'rows', 'cells')
+
+    def __init__(self, cols, rows, cells):
+        if len(cells) != cols * rows:
+            raise ValueError(f"{cols}x{rows} map needs {cols * rows} tiles, got {len(cells)}")
+        cells = bytes(cells)
+        if cells.translate(None, bytes((FLOOR, BRICK))):
+            raise ValueError("unknown tile code in map")
+        self.cols = cols
+        self.rows = rows
+        self.cells = cells
+
+    @classmethod
+    def from_grid(cls, grid):
+        return cls(grid.cols, grid.rows, grid.cells)
+
+    @property
+    def config(self):
+        return WorldConfig(self.cols, self.rows, blocks=self.cells.count(BRICK))
+
+    def blocks(self):
+        """(col, row) of every brick, row by row."""
+        cols, cells = self.cols, self.cells
+        i = cells.find(BRICK)
+        while i >= 0:
+            yield i % cols, i // cols
+            i = cells.find(BRICK, i + 1)
+
+    def connected(self, tiles):
+        """True if every tile in tiles is floor and can drive to all the others round the bricks."""
+        tiles = [row * self.cols + col for col, row in tiles]
+        cols, cells, size = self.cols, self.cells, len(self.cells)
+        if not tiles:
+            return True
+        if any(cells[i] for i in tiles):
+            return False
+        seen = bytearray(len(cells))
+        seen[tiles[0]] = 1
+        queue = deque(tiles[:1])
+        while queue:
+            for j in neighbors(queue.popleft(), cols, size):
+                if not seen[j] and not cells[j]:
+                    seen[j] = 1
+                    queue.append(j)
+        return all(seen[i] for i in tiles)
+
+def save(path, tilemap):
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, tilemap.cols, tilemap.rows, tilemap.cells.count(BRICK)))
+        f.write(tilemap.cells)
+
+def load(path):
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path}: not a tile map")
+        magic, version, cols, rows, blocks = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} tile map")
+        if len(data) != HEADER.size + cols * rows:
+            raise ValueError(f"{path}: truncated tile map")
+        tilemap = TileMap(cols, rows, data[HEADER.size:])
+    if tilemap.cells.count(BRICK) != blocks:
+        raise ValueError(f"{path}: block count does not match the tiles")
+    return tilemap
@@ -0,0 +1,107 @@
+"""AI-vs-AI tournament runner.
+
+Plays many seeded headless matches between AIApproach1 and AIApproach2 on a
+process pool and prints win rates, match lengths and 95% confidence
+intervals. Every seed is played twice with the approaches swapped between
+the blue (top-left) and red (bottom-right) spawn, so neither side gets a
+spawn advantage.
+
+    python tournament.py --matches 2000 --workers 8
+"""
+import argparse
+import math
+import os
+import statistics
+import time
+from multiprocessing import Pool
+
+from engine import simulate
+from ai_approach_1 import AIApproach1
+from ai_approach_2 import AIApproach2
+
+APPROACHES = [AIApproach1, AIApproach2]
+
+def play_match(job):
+    seed, swapped, max_ticks = job
+    blue_ai, red_ai = APPROACHES[::-1] if swapped else APPROACHES
+    result = simulate("ai_vs_ai", seed=seed, max_ticks=max_ticks, blue_ai=blue_ai, red_ai=red_ai)
+    sides = {'blue': blue_ai.__name__, 'red': red_ai.__name__}
+    result['sides'] = sides
+    result['winner_ai'] = sides.get(result['winner'])
+    return result
+
+def wilson_interval(wins, n, z=1.96):
+    """95% Wilson score interval for a win rate of wins/n."""
+    if n == 0:
+        return 0.0, 0.0
+    p = wins / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+def summarize(results):
+    n = len(results)
+    names = [ai.__name__ for ai in APPROACHES]
+    lengths = [r['ticks'] for r in results]
+    summary = {'matches': n, 'draws': sum(1 for r in results if r['winner'] is None), 'approaches': {}}
+    for name in names:
+        wins = sum(1 for r in results if r['winner_ai'] == name)
+        won_lengths = [r['ticks'] for r in results if r['winner_ai'] == name]
+        by_side = {}
+        for side in ('blue', 'red'):
+            played = [r for r in results if r['sides'][side] == name]
+            by_side[side] = (sum(1 for r in played if r['winner'] == side), len(played))
+        summary['approaches'][name] = {
+            'wins': wins,
+            'win_rate': wins / n if n else 0.0,
+            'ci95': wilson_interval(wins, n),
+            'mean_win_ticks': statistics.mean(won_lengths) if won_lengths else 0.0,
+            'by_side': by_side,
+        }
+    summary['mean_ticks'] = statistics.mean(lengths) if lengths else 0.0
+    summary['median_ticks'] = statistics.median(lengths) if lengths else 0.0
+    summary['total_ticks'] = sum(lengths)
+    return summary
+
+def run_tournament(matches=200, workers=None, max_ticks=60 * 60 * 5, base_seed=0):
+    """Play `matches` seeds (each twice, sides swapped) and return (summary, results)."""
+    jobs = [(base_seed + i, swapped, max_ticks) for i in range(matches) for swapped in (False, True)]
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_match(job) for job in jobs]
+    else:
+        with Pool(workers) as pool:
+            # Small chunks keep the pool balanced: match lengths vary tenfold.
+            results = list(pool.imap_unordered(play_match, jobs, chunksize=4))
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+    summary['workers'] = workers
+    summary['seconds'] = elapsed
+    return summary, results
+
+def print_summary(summary):
+    n = summary['matches']
+    secs = summary['seconds']
+    print(f"{n} matches on {summary['workers']} workers in {secs:.1f}s "
+          f"({n / secs:.1f} matches/s, {summary['total_ticks'] / secs:,.0f} ticks/s)")
+    for name, s in summary['approaches'].items():
+        lo, hi = s['ci95']
+        blue_w, blue_n = s['by_side']['blue']
+        red_w, red_n = s['by_side']['red']
+        print(f"  {name}: {s['wins']} wins, {s['win_rate']:.1%} [95% CI {lo:.1%} - {hi:.1%}], "
+              f"blue {blue_w}/{blue_n}, red {red_w}/{red_n}, "
+              f"mean length of wins {s['mean_win_ticks']:.0f} ticks")
+    print(f"  Draws (max ticks reached): {summary['draws']}")
+    print(f"  Match length: mean {summary['mean_ticks']:.0f}, median {summary['median_ticks']:.0f} ticks")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run an AIApproach1 vs AIApproach2 tournament.")
+    parser.add_argument('--matches', type=int, default=200, help="number of seeds; each is played from both sides")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--max-ticks', type=int, default=60 * 60 * 5, help="ticks before a match is a draw")
+    parser.add_argument('--seed', type=int, default=0, help="first seed")
+    args = parser.parse_args()
+    summary, _ = run_tournament(args.matches, args.workers, args.max_ticks, args.seed)
+    print_summary(summary)
@@ -1,43 +1,63 @@
 import os
-from ai_approach_1 import AIApproach1
-from ai_approach_2 import AIApproach2
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 
 import pygame
-from random import randint
+import argparse
+import time
 import webbrowser
 import tempfile
-import heapq
+
+from engine import Match, MODES, parse_teams, assets, convert_sprites
+from config import WIDTH, HEIGHT, WorldConfig, DEFAULT
+from render import TextCache, TerrainLayer, DirtyRenderer
+from replay import ReplayRecorder
+from profiler import FrameProfiler
+from planner_worker import PlanningWorker
+from levelpool import LevelPool
+import tilemap
+
+parser = argparse.ArgumentParser(description="Two Tanks")
+parser.add_argument('--map', type=WorldConfig.parse, default=DEFAULT,
+                    help="map size in tiles and optional block count, COLSxROWS[:BLOCKS], e.g. 256x256")
+parser.add_argument('--teams', type=parse_teams, default=parse_teams('2x32'),
+                    help="battle team sizes, NxSIZE or SIZE,SIZE,..., e.g. 2x32 or 16x1 (free-for-all)")
+parser.add_argument('--level', type=tilemap.load, default=None,
+                    help="play every game on this map (a .ttm file, saved with F6) instead of random ones")
+args = parser.parse_args()
 
 pygame.init()
 pygame.mixer.init()
 pygame.mixer.set_num_channels(64)
-CH_BLUE_MOVE = 0
-CH_RED_MOVE = 1
 
-WIDTH, HEIGHT = 640, 480
 FPS = 60
-TILE = 32
+# The simulation always advances in fixed 1/60 s ticks; rendering runs at
+# FPS and interpolates between the last two ticks.
+TICK_RATE = 60
+SIM_DT = 1.0 / TICK_RATE
+MAX_FRAME_TIME = 0.25
+SPEEDS = [1, 4, 16, 0]  # AI vs AI and battle fast-forward, cycled with TAB; 0 = uncapped
+SPECTATOR_MODES = ("ai_vs_ai", "battle")
+BATTLE_MAP = WorldConfig(64, 48)  # unless --map is given
+UNCAPPED_BUDGET = 0.75 / FPS  # share of each frame spent simulating when uncapped
+REPLAY_DIR = 'replays'
+PROFILE_DIR = 'profiles'
+LEVEL_DIR = 'levels'
 
 window = pygame.display.set_mode((WIDTH, HEIGHT))
+convert_sprites()
 clock = pygame.time.Clock()
 
 fontUI = pygame.font.Font(None, 30)
 bigFont = pygame.font.Font(None, 60)
-
-def load_image(path):
-    try:
-        return pygame.image.load(path)
-    except:
-        surf = pygame.Surface((TILE, TILE))
-        surf.fill((200, 0, 200))
-        return surf
-
-imgBrick = load_image('images/block_brick.png')
-imgTanks = [load_image(f'images/tank{i}.png') for i in range(1, 9)]
-imgBangs = [load_image(f'images/bang{i}.png') for i in range(1, 4)]
-imgBonuses = [load_image('images/bonus_star.png'), load_image('images/bonus_tank.png')]
+fontMono = pygame.font.SysFont('monospace', 13)
+text_cache = TextCache()
+terrain = TerrainLayer((WIDTH, HEIGHT), (10, 10, 20), assets.get('block_brick'))
+renderer = DirtyRenderer(window)
+profiler = FrameProfiler()  # F3 toggles recording and the overlay
+planning_worker = PlanningWorker()  # AI path searches run in the time the loop waits for the next frame
+level_pool = LevelPool()  # maps for the next games, generated while the menu is up
+profiler_lines = []
 
 snd_shoot = snd_explosion = snd_bonus = snd_dead = snd_move = None
 try:
@@ -51,14 +71,14 @@ try:
 except Exception as e:
     print("Sound error:", e)
 
-DIRECTS = [[0, -1], [1, 0], [0, 1], [-1, 0]]
-MOVE_SPEED =    [1, 2, 2, 1, 2, 3, 3, 2]
-BULLET_SPEED =  [4, 5, 6, 5, 5, 5, 6, 7]
-BULLET_DAMAGE = [1, 1, 2, 3, 2, 2, 3, 4]
-SHOT_DELAY =    [60, 50, 30, 40, 30, 25, 25, 30]
+sounds = {'shoot': snd_shoot, 'explosion': snd_explosion, 'bonus': snd_bonus,
+          'dead': snd_dead, 'move': snd_move}
 
-bullets = []
-objects = []
+match = None
+camera = (0, 0)
+speed_index = 0
+accumulator = 0.0
+frame_time = 0.0
 game_started = False
 game_over = False
 winner = None
@@ -69,6 +89,7 @@ game_mode = "human_vs_human"
 menu_new_hvh_rect = pygame.Rect(0, 0, 1, 1)
 menu_new_hva_rect = pygame.Rect(0, 0, 1, 1)
 menu_new_ava_rect = pygame.Rect(0, 0, 1, 1)
+menu_new_battle_rect = pygame.Rect(0, 0, 1, 1)
 menu_resume_rect = pygame.Rect(0, 0, 1, 1)
 menu_controls_rect = pygame.Rect(0, 0, 1, 1)
 menu_exit_rect = pygame.Rect(0, 0, 1, 1)
@@ -109,258 +130,143 @@ def open_controls_window():
     tmp.close()
     webbrowser.open_new_tab('file://' + os.path.abspath(tmp.name))
 
-def count_blocks_in_path(pos1, pos2, blocks):
-    """Count unique blocks between two points (for FIS rule: shoot if exactly 1 block)"""
-    x1, y1 = pos1
-    x2, y2 = pos2
-    dx = x2 - x1
-    dy = y2 - y1
-    steps = max(abs(dx), abs(dy))
-    if steps == 0:
-        return 0
-
-    block_set = set()
-    for i in range(1, int(steps)):
-        t = i / steps
-        x = x1 + dx * t
-        y = y1 + dy * t
-        for block in blocks:
-            if block.rect.collidepoint(x, y):
-                block_set.add(id(block))
-                break
-    return len(block_set)
-
-def spawn_bonus_safely():
-    """Spawn a bonus at a random position not inside any block or other object."""
-    for _ in range(100):
-        x = randint(50, WIDTH - 50)
-        y = randint(50, HEIGHT - 50)
-        bonus_rect = pygame.Rect(x - TILE//2, y - TILE//2, TILE, TILE)
-        if not any(hasattr(obj, 'rect') and obj.rect.colliderect(bonus_rect) for obj in objects):
-            return Bonus(x, y, randint(0, len(imgBonuses)-1))
-    # Fallback
-    return Bonus(randint(50, WIDTH-50), randint(50, HEIGHT-50), randint(0, len(imgBonuses)-1))
-
 class UI:
     def update(self): pass
     def draw(self):
-        i = 0
-        for obj in objects:
-            if obj.type == 'tank':
+        """Draw one panel per tank (per team in a battle); return the panel rects."""
+        if game_mode == "battle":
+            panels = self.draw_teams()
+        else:
+            panels = []
+            i = 0
+            for obj in match.tanks:
                 panel_x = 10 + i * 100
-                pygame.draw.rect(window, (30, 30, 40), (panel_x, 10, 90, 40), border_radius=8)
+                panels.append(pygame.draw.rect(window, (30, 30, 40), (panel_x, 10, 90, 40), border_radius=8))
                 pygame.draw.rect(window, obj.color, (panel_x + 5, 15, 20, 20))
-                rank_text = fontUI.render(f"R{obj.rank}", True, "white")
+                rank_text = text_cache.render(fontUI, f"R{obj.rank}", "white")
                 window.blit(rank_text, (panel_x + 30, 15))
-                hp_text = fontUI.render(f"HP: {obj.hp}", True, "white")
+                hp_text = text_cache.render(fontUI, f"HP: {obj.hp}", "white")
                 window.blit(hp_text, (panel_x + 30, 32))
                 i += 1
+        speed = SPEEDS[speed_index] if game_mode in SPECTATOR_MODES else 1
+        if speed != 1:
+            label = text_cache.render(fontUI, f"x{speed}" if speed else "MAX", "yellow")
+            panels.append(window.blit(label, label.get_rect(topright=(WIDTH - 10, 15))))
+        return panels
+
+    def draw_teams(self):
+        """Tanks left per team, largest teams first, as many as fit beside the speed label."""
+        alive = {}
+        for obj in match.tanks:
+            alive.setdefault(obj.team, [obj.color, 0])[1] += 1
+        panels = []
+        ranked = sorted(alive.items(), key=lambda item: -item[1][1])
+        for i, (team, (color, count)) in enumerate(ranked[:(WIDTH - 80) // 100]):
+            panel_x = 10 + i * 100
+            panels.append(pygame.draw.rect(window, (30, 30, 40), (panel_x, 10, 90, 40), border_radius=8))
+            pygame.draw.rect(window, color, (panel_x + 5, 15, 20, 20))
+            window.blit(text_cache.render(fontUI, f"x{count}", "white"), (panel_x + 30, 15))
+        return panels
+
+def map_config(mode):
+    return BATTLE_MAP if mode == "battle" and args.map is DEFAULT else args.map
 
-class Tank:
-    def __init__(self, color, px, py, direct, keyList, ai_controlled=False, ai_approach=None):
-        objects.append(self)
-        self.type = 'tank'
-        self.color = color
-        self.rect = pygame.Rect(px, py, TILE, TILE)
-        self.direct = direct
-        self.hp = 5
-        self.shotTimer = 0
-        self.rank = 0
-        self.image = pygame.transform.rotate(imgTanks[self.rank], -self.direct * 90)
-        self.rect = self.image.get_rect(center=self.rect.center)
-        self.keyLEFT, self.keyRIGHT, self.keyUP, self.keyDOWN, self.keySHOT = keyList
-        self.ai_controlled = ai_controlled
-        self.is_moving = False
-        self.move_channel = pygame.mixer.Channel(CH_BLUE_MOVE if color == 'blue' else CH_RED_MOVE)
-
-        self.ai_approach = None
-        if ai_controlled and ai_approach:  # Inject AI behavior
-            if ai_approach == AIApproach1:
-                self.ai_approach = ai_approach(self, objects, snd_move, snd_shoot)
-            elif ai_approach == AIApproach2:
-                self.ai_approach = ai_approach(self, objects, snd_shoot)
-            else:
-                self.ai_approach = ai_approach(self, objects)
-
-    def update(self):
-        self.image = pygame.transform.rotate(imgTanks[self.rank], -self.direct * 90)
-        w, h = self.image.get_width(), self.image.get_height()
-        self.image = pygame.transform.scale(self.image, (max(8, w - 5), max(8, h - 5)))
-        self.rect = self.image.get_rect(center=self.rect.center)
-
-        self.moveSpeed = MOVE_SPEED[self.rank]
-        self.shotDelay = SHOT_DELAY[self.rank]
-        self.bulletSpeed = BULLET_SPEED[self.rank]
-        self.bulletDamage = BULLET_DAMAGE[self.rank]
+def reset_game():
+    global match, recorder, ui, game_over, winner, accumulator, camera
+    camera = (0, 0)
+    config = map_config(game_mode)
+    seed, layout = None, args.level
+    if layout is None:
+        seed, layout = level_pool.take(game_mode, config, args.teams) or (None, None)
+    # A battle's dozens of AIs would swamp the worker with searches: they plan inline within the AI budget
+    worker = planning_worker if game_mode != "battle" else None
+    match = Match(game_mode, seed=seed, sounds=sounds, audio=True, profiler=profiler, config=config,
+                  planning_worker=worker, teams=args.teams, layout=layout)
+    match.reset()
+    recorder = ReplayRecorder(match)
+    ui = UI()
+    accumulator = 0.0
+    game_over = False
+    winner = None
 
-        if self.ai_controlled and self.ai_approach:
-            self.ai_approach.update()
-        else:
-            self._player_update()
-
-    def _player_update(self):
-        oldX, oldY = self.rect.topleft
-        moving_now = False
-        if keys[self.keyLEFT]:
-            self.rect.x -= self.moveSpeed; self.direct = 3; moving_now = True
-        elif keys[self.keyRIGHT]:
-            self.rect.x += self.moveSpeed; self.direct = 1; moving_now = True
-        elif keys[self.keyUP]:
-            self.rect.y -= self.moveSpeed; self.direct = 0; moving_now = True
-        elif keys[self.keyDOWN]:
-            self.rect.y += self.moveSpeed; self.direct = 2; moving_now = True
-
-        self.rect.clamp_ip(pygame.Rect(0, 0, WIDTH, HEIGHT))
-
-        for obj in objects:
-            if obj != self and (obj.type == 'block' or obj.type == 'tank') and self.rect.colliderect(obj.rect):
-                self.rect.topleft = oldX, oldY
-                moving_now = False
-
-        if moving_now and not self.is_moving:
-            if snd_move: self.move_channel.play(snd_move, loops=-1)
-            self.is_moving = True
-        elif not moving_now and self.is_moving:
-            self.move_channel.stop()
-            self.is_moving = False
-
-        if keys[self.keySHOT] and self.shotTimer == 0:
-            Bullet(self, self.rect.centerx, self.rect.centery,
-                   DIRECTS[self.direct][0] * self.bulletSpeed,
-                   DIRECTS[self.direct][1] * self.bulletSpeed,
-                   self.bulletDamage)
-            if snd_shoot: snd_shoot.play()
-            self.shotTimer = self.shotDelay
-
-        if self.shotTimer > 0:
-            self.shotTimer -= 1
+def save_replay():
+    try:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        path = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{match.mode}-{match.seed}.ttr")
+        recorder.save(path)
+    except OSError as e:
+        print(f"Could not save replay: {e}")
 
-    def draw(self):
-        window.blit(self.image, self.rect)
-
-    def damage(self, value):
-        global game_over, winner, state
-        self.hp -= value
-        if self.hp <= 0:
-            try: objects.remove(self)
-            except: pass
-            if hasattr(self, 'move_channel'):
-                self.move_channel.stop()
-            game_over = True
-            state = "gameover"
-            winner = "Red Wins!" if self.color == "blue" else "Blue Wins!"
-            if snd_explosion: snd_explosion.play()
-            if snd_dead: snd_dead.play()
-
-class Bullet:
-    def __init__(self, parent, px, py, dx, dy, damage):
-        bullets.append(self)
-        self.parent = parent
-        self.px, self.py = float(px), float(py)
-        self.dx, self.dy = dx, dy
-        self.damage = damage
-    def update(self):
-        self.px += self.dx; self.py += self.dy
-        if not (0 <= self.px <= WIDTH and 0 <= self.py <= HEIGHT):
-            if self in bullets: bullets.remove(self)
-        else:
-            for obj in objects[:]:
-                if obj != self.parent and obj.type not in ['bang', 'bonus']:
-                    if obj.rect.collidepoint(int(self.px), int(self.py)):
-                        obj.damage(self.damage)
-                        if self in bullets: bullets.remove(self)
-                        Bang(self.px, self.py)
-                        if snd_explosion: snd_explosion.play()
-                        break
-    def draw(self):
-        pygame.draw.circle(window, 'yellow', (int(self.px), int(self.py)), 2)
-
-class Bang:
-    def __init__(self, px, py):
-        objects.append(self); self.type='bang'; self.px,self.py=px,py; self.frame=0
-    def update(self):
-        self.frame += 0.2
-        if self.frame >= 3:
-            if self in objects: objects.remove(self)
-    def draw(self):
-        img = imgBangs[int(self.frame)]
-        rect = img.get_rect(center=(int(self.px), int(self.py)))
-        window.blit(img, rect)
+def save_level():
+    try:
+        os.makedirs(LEVEL_DIR, exist_ok=True)
+        tilemap.save(os.path.join(LEVEL_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{match.seed}.ttm"),
+                     tilemap.TileMap.from_grid(match.grid))  # as it stands, destroyed blocks gone
+    except OSError as e:
+        print(f"Could not save level: {e}")
 
-class Block:
-    def __init__(self, px, py, size):
-        objects.append(self); self.type='block'; self.rect=pygame.Rect(px,py,size,size); self.hp=1
-    def update(self): pass
-    def draw(self): window.blit(imgBrick, self.rect)
-    def damage(self, value):
-        self.hp -= value
-        if self.hp <= 0:
-            if self in objects: objects.remove(self)
-
-class Bonus:
-    def __init__(self, px, py, bonusNum):
-        objects.append(self)
-        self.type = 'bonus'
-        self.image = imgBonuses[bonusNum]
-        self.rect = self.image.get_rect(center=(px, py))
-        self.timer = 900  # 15 seconds
-        self.bonusNum = bonusNum
-    def update(self):
-        if self.timer > 0:
-            self.timer -= 1
-        else:
-            if self in objects: objects.remove(self)
-            return
-        for obj in objects[:]:
-            if obj.type == 'tank' and self.rect.colliderect(obj.rect):
-                if self.bonusNum == 0 and obj.rank < len(imgTanks) - 1:
-                    obj.rank += 1
-                    if snd_bonus: snd_bonus.play()
-                elif self.bonusNum == 1:
-                    obj.hp += 1
-                    if snd_bonus: snd_bonus.play()
-                if self in objects: objects.remove(self)
-                break
-    def draw(self):
-        if self.timer % 30 < 15:
-            window.blit(self.image, self.rect)
+def camera_position(alpha):
+    """Top-left corner of the view, clamped to the map.
 
-def reset_game():
-    global bullets, objects, ui, game_over, winner
-    bullets = []; objects = []
-    if game_mode == "ai_vs_ai":
-        Tank('blue', TILE, TILE, 1, (0,0,0,0,0), ai_controlled=True, ai_approach=AIApproach1)
-        Tank('red', WIDTH - 2*TILE, HEIGHT - 2*TILE, 3, (0,0,0,0,0), ai_controlled=True, ai_approach=AIApproach2)
-        for _ in range(3):
-            spawn_bonus_safely()
-    elif game_mode == "human_vs_ai":
-        Tank('blue', 100, HEIGHT//2 - TILE//2, 0, (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_SPACE), ai_controlled=False)
-        Tank('red', WIDTH - 100 - TILE, HEIGHT//2 - TILE//2, 0, (0,0,0,0,0), ai_controlled=True, ai_approach=AIApproach1)
+    Centred between the human tanks (every tank in AI vs AI) while they fit
+    on screen together, otherwise on the first of them.
+    """
+    tanks = [t for t in match.tanks if not t.ai_controlled] or list(match.tanks)
+    if not tanks or (match.width <= WIDTH and match.height <= HEIGHT):
+        return camera
+    centers = []
+    for t in tanks:
+        (px, py), (cx, cy) = t.prev_center, t.rect.center
+        centers.append((px + (cx - px) * alpha, py + (cy - py) * alpha))
+    xs, ys = [c[0] for c in centers], [c[1] for c in centers]
+    if max(xs) - min(xs) < WIDTH - 64 and max(ys) - min(ys) < HEIGHT - 64:
+        x, y = (max(xs) + min(xs)) / 2, (max(ys) + min(ys)) / 2
     else:
-        Tank('blue', 100, HEIGHT//2 - TILE//2, 0, (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_SPACE), ai_controlled=False)
-        Tank('red', WIDTH - 100 - TILE, HEIGHT//2 - TILE//2, 0, (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_RETURN), ai_controlled=False)
-
-    ui = UI()
-    for _ in range(50):
-        while True:
-            x = randint(0, WIDTH // TILE - 1) * TILE
-            y = randint(1, HEIGHT // TILE - 1) * TILE
-            rect = pygame.Rect(x, y, TILE, TILE)
-            if not any(rect.colliderect(obj.rect) for obj in objects if hasattr(obj, 'rect')):
-                break
-        Block(x, y, TILE)
-    game_over = False
-    winner = None
+        x, y = centers[0]
+    x = round(x) - WIDTH // 2
+    y = round(y) - HEIGHT // 2
+    return (min(max(0, x), max(0, match.width - WIDTH)), min(max(0, y), max(0, match.height - HEIGHT)))
+
+def draw_profiler():
+    """Per-phase p50/p99 overlay, refreshed twice a second; return the rect drawn."""
+    global profiler_lines
+    if profiler.frames % 30 == 0 or not profiler_lines:
+        profiler_lines = ["phase     p50    p99 ms"] + [f"{name:<7} {p50:6.2f} {p99:6.2f}"
+                                                     for name, (p50, p99) in profiler.stats().items()]
+    panel = pygame.draw.rect(window, (0, 0, 0), (WIDTH - 200, 60, 190, 8 + 15 * len(profiler_lines)))
+    for i, line in enumerate(profiler_lines):
+        window.blit(text_cache.render(fontMono, line, "lightgreen"), (panel.x + 6, panel.y + 4 + 15 * i))
+    return panel
+
+def save_profile():
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"frames-{time.strftime('%Y%m%d-%H%M%S')}")
+        profiler.dump(base + '.csv')
+        profiler.dump(base + '.json')
+    except OSError as e:
+        print(f"Could not save profile: {e}")
+
+def battle_label():
+    teams = args.teams
+    if set(teams) == {1}:
+        return f"Free-for-all ({len(teams)})"
+    if len(teams) <= 3:
+        return "Battle " + " vs ".join(map(str, teams))
+    return f"Battle: {len(teams)} teams"
 
 def draw_button(text, x, y, w, h):
     rect = pygame.Rect(x, y, w, h)
     pygame.draw.rect(window, (70, 130, 180), rect, border_radius=12)
     pygame.draw.rect(window, (200, 220, 255), rect, 2, border_radius=12)
-    label = fontUI.render(text, True, "white")
+    label = text_cache.render(fontUI, text, "white")
     window.blit(label, label.get_rect(center=rect.center))
     return rect
 
 # reset_game()
+if args.level is None:
+    for mode in MODES:
+        level_pool.fill(mode, map_config(mode), args.teams)
 play = True
 keys = pygame.key.get_pressed()
 
@@ -373,6 +279,16 @@ while play:
             state = "menu"
             pygame.mixer.stop()
 
+        if state == "game" and event.type == pygame.KEYDOWN and event.key == pygame.K_TAB and game_mode in SPECTATOR_MODES:
+            speed_index = (speed_index + 1) % len(SPEEDS)
+
+        if state == "game" and event.type == pygame.KEYDOWN and event.key == pygame.K_F6:
+            save_level()
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            profiler.toggle()
+            renderer.invalidate()
+
         if event.type == pygame.MOUSEBUTTONDOWN:
             mx, my = event.pos
             
@@ -386,6 +302,9 @@ while play:
                 elif menu_new_ava_rect.collidepoint(mx, my):
                     game_mode = "ai_vs_ai"
                     reset_game(); state = "game"; game_started = True
+                elif menu_new_battle_rect.collidepoint(mx, my):
+                    game_mode = "battle"
+                    reset_game(); state = "game"; game_started = True
                 elif menu_resume_rect.collidepoint(mx, my) and game_started and not game_over:
                     state = "game"
                 elif menu_controls_rect.collidepoint(mx, my):
@@ -402,69 +321,116 @@ while play:
                     play = False
 
     keys = pygame.key.get_pressed()
-    window.fill((10, 10, 20))
+    if state != "game":
+        window.fill((10, 10, 20))
+        renderer.invalidate()
 
     if state == "menu":
         window.fill((10, 10, 20))
-        title = bigFont.render("TANK BATTLE", True, "yellow")
+        title = text_cache.render(bigFont, "TANK BATTLE", "yellow")
         window.blit(title, title.get_rect(center=(WIDTH//2, 80)))
 
         button_w, button_h = 220, 45
         start_x = WIDTH//2 - button_w//2
-        y0 = 160
-        spacing = 55
+        y0 = 130
+        spacing = 50
 
         menu_new_hvh_rect = draw_button("Human vs Human", start_x, y0, button_w, button_h)
         menu_new_hva_rect = draw_button("Human vs AI", start_x, y0 + spacing, button_w, button_h)
         menu_new_ava_rect = draw_button("AI vs AI", start_x, y0 + 2*spacing, button_w, button_h)
-        menu_controls_rect = draw_button("Controls", start_x, y0 + 3*spacing, button_w, button_h)
-        menu_exit_rect = draw_button("Exit", start_x, y0 + 4*spacing, button_w, button_h)
+        menu_new_battle_rect = draw_button(battle_label(), start_x, y0 + 3*spacing, button_w, button_h)
+        menu_controls_rect = draw_button("Controls", start_x, y0 + 4*spacing, button_w, button_h)
+        menu_exit_rect = draw_button("Exit", start_x, y0 + 5*spacing, button_w, button_h)
 
         if game_started and not game_over:
-            menu_resume_rect = draw_button("Resume Game", start_x, y0 + 5*spacing, button_w, button_h)
+            menu_resume_rect = draw_button("Resume Game", start_x, y0 + 6*spacing, button_w, button_h)
 
     elif state == "controls":
         window.fill((15, 15, 25))
-        title = bigFont.render("Game Controls", True, "cyan")
+        title = text_cache.render(bigFont, "Game Controls", "cyan")
         window.blit(title, title.get_rect(center=(WIDTH//2, 60)))
         lines = [
             "🔵 Blue Tank: W A S D to move, SPACE to shoot",
             "🔴 Red Tank: Arrow Keys + ENTER (Human) or Auto (AI)",
+            "Battle: AI teams (--teams), TAB to fast-forward",
+            "F6 saves the map, --level FILE plays it again",
             "Press ESC anytime to pause and return to Menu",
             "Click 'Back' to return to main menu.",
         ]
         for i, line in enumerate(lines):
-            label = fontUI.render(line, True, "lightgray")
+            label = text_cache.render(fontUI, line, "lightgray")
             window.blit(label, (60, 160 + i*40))
         draw_button("Back", *controls_back_rect)
 
     elif state == "game":
         if not game_over:
-            # FIS: Always maintain ≥4 bonuses, safely spawned
-            bonuses = [obj for obj in objects if obj.type == 'bonus']
-            while len(bonuses) < 4:
-                spawn_bonus_safely()
-                bonuses = [obj for obj in objects if obj.type == 'bonus']
-            
-            for bullet in bullets[:]: bullet.update()
-            for obj in objects[:]: obj.update()
+            speed = SPEEDS[speed_index] if game_mode in SPECTATOR_MODES else 1
+            if speed:
+                accumulator += frame_time * speed
+                ticks = 0
+                while accumulator >= SIM_DT and not match.game_over:
+                    recorder.step(keys)
+                    accumulator -= SIM_DT
+                    ticks += 1
+                    if ticks >= 4 * speed:  # can't keep up: drop the backlog instead of spiralling
+                        accumulator = 0.0
+                        break
+            else:
+                deadline = time.perf_counter() + UNCAPPED_BUDGET
+                while not match.game_over and time.perf_counter() < deadline:
+                    recorder.step(keys)
+                accumulator = 0.0
             ui.update()
-        for bullet in bullets[:]: bullet.draw()
-        for obj in objects[:]: obj.draw()
-        ui.draw()
+            if match.game_over:
+                game_over = True
+                state = "gameover"
+                winner = f"{match.winner.title()} Wins!" if match.winner else "Draw!"
+                save_replay()
+        profiler.start()
+        alpha = accumulator / SIM_DT
+        camera = camera_position(alpha)
+        changed = terrain.sync(match.grid, camera)
+        if changed is None:
+            renderer.invalidate()
+        renderer.erase(terrain.surface)
+        if changed:
+            for rect in changed:
+                window.blit(terrain.surface, rect, rect)
+            renderer.mark_all(changed)
+        renderer.mark_all(match.bullets.draw(window, alpha, camera))
+        for obj in match.tanks:
+            rect = obj.draw(window, alpha, camera)
+            if game_mode == "battle":  # every tank has the same sprite: mark its team
+                rect = rect.union(pygame.draw.rect(window, obj.color, (rect.x, rect.y - 4, rect.w, 3)))
+            renderer.mark(rect)
+        for obj in (*match.bonuses, *match.bangs):
+            renderer.mark(obj.draw(window, camera))
+        renderer.mark_all(ui.draw())
+        if profiler.enabled:
+            renderer.mark(draw_profiler())
+        profiler.lap('draw')
 
     elif state == "gameover":
         window.fill((20, 10, 10))
-        text = bigFont.render("GAME OVER", True, "red")
+        text = text_cache.render(bigFont, "GAME OVER", "red")
         window.blit(text, text.get_rect(center=(WIDTH//2, HEIGHT//3 - 20)))
         if winner:
-            win_text = fontUI.render(winner, True, "gold")
+            win_text = text_cache.render(fontUI, winner, "gold")
             window.blit(win_text, win_text.get_rect(center=(WIDTH//2, HEIGHT//2)))
         draw_button("New Game", *gameover_new_rect)
         draw_button("Exit", *gameover_exit_rect)
         pygame.mixer.stop()
 
-    pygame.display.update()
-    clock.tick(FPS)
+    if state == "game":
+        renderer.flush()
+        profiler.lap('flip')
+        profiler.end_frame()
+    else:
+        pygame.display.update()
+    frame_time = min(clock.tick(FPS) / 1000.0, MAX_FRAME_TIME)
 
+if profiler.frames:
+    save_profile()
+planning_worker.shutdown()
+level_pool.shutdown()
 pygame.quit()
\ No newline at end of file
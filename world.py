@@ -0,0 +1,115 @@
+from bullets import BulletPool
+from freecells import FreeCells
+from grid import OccupancyGrid
+from spatial import SpatialHash
+
+class Registry:
+    """Insertion-ordered set of entities with O(1) add and remove.
+
+    Iterating yields a snapshot, so entities may add or remove themselves
+    (or others) while the registry is being updated.
+    """
+    __slots__ = ('items',)
+
+    def __init__(self):
+        self.items = {}
+
+    def add(self, obj):
+        self.items[obj] = None
+
+    def discard(self, obj):
+        """Remove obj; return whether it was present."""
+        if obj in self.items:
+            del self.items[obj]
+            return True
+        return False
+
+    def __contains__(self, obj):
+        return obj in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(tuple(self.items))
+
+    def snapshot(self):
+        return tuple(self.items)
+
+    def restore(self, state):
+        self.items = dict.fromkeys(state)
+
+class World:
+    """Container for every entity of a match, indexed by type.
+
+    Tanks, blocks and bonuses are also filed in the spatial hash and counted
+    in the free-cell index (move() keeps both current as a tank drives);
+    blocks keep the occupancy grid up to date themselves. Bullets are not
+    entities but rows of the BulletPool.
+
+    snapshot() copies only plain values (registry membership, each entity's
+    mutable fields, map bytes, spatial buckets, free cells, bullet arrays);
+    entities are kept by reference, so restoring re-adds removed ones and
+    drops those created since, without copying any pygame object. It still
+    copies all of them, so its cost grows with the map: every block's
+    state, the spatial buckets and the free-cell arrays (a map's worth of
+    counts), plus a match's AI search state. That is about 60 us on the
+    default map and under 1 ms in a 32 vs 32 battle, but about 10 ms on a
+    256x256 map of some 11000 blocks, several times what a tick there
+    takes. A restore costs about as much, and puts the map back through
+    set_blocked, so `grid.changes` grows by the tiles it reverts.
+    """
+    HAS_RECT = ('tank', 'block', 'bonus')
+
+    def clear(self, cols, rows, tile):
+        self.tanks = Registry()
+        self.blocks = Registry()
+        self.bonuses = Registry()
+        self.bangs = Registry()
+        self.bullets = BulletPool(self)
+        self.by_type = {'tank': self.tanks, 'block': self.blocks, 'bonus': self.bonuses,
+                        'bang': self.bangs}
+        self.grid = OccupancyGrid(cols, rows, tile)
+        self.spatial = SpatialHash(2 * tile)
+        self.free_cells = FreeCells(cols, rows, tile)
+
+    def add(self, obj):
+        self.by_type[obj.type].add(obj)
+        if obj.type in self.HAS_RECT:
+            self.spatial.insert(obj)
+            self.free_cells.insert(obj)
+
+    def remove(self, obj):
+        """Take obj out of the world; return False if it was already gone."""
+        if not self.by_type[obj.type].discard(obj):
+            return False
+        if obj.type in self.HAS_RECT:
+            self.spatial.remove(obj)
+            self.free_cells.remove(obj)
+        return True
+
+    def move(self, obj):
+        """Refile obj after its rect changed."""
+        self.spatial.move(obj)
+        self.free_cells.move(obj)
+
+    def snapshot(self):
+        return ({name: reg.snapshot() for name, reg in self.by_type.items()},
+                [(obj, obj.snapshot()) for obj in self.all_objects()],
+                self.grid.snapshot(), self.spatial.snapshot(), self.free_cells.snapshot(),
+                self.bullets.snapshot())
+
+    def restore(self, state):
+        registries, objects, grid, spatial, free_cells, bullets = state
+        for name, reg in registries.items():
+            self.by_type[name].restore(reg)
+        for obj, obj_state in objects:
+            obj.restore(obj_state)
+        self.grid.restore(grid)
+        self.spatial.restore(spatial)
+        self.free_cells.restore(free_cells)
+        self.bullets.restore(bullets)
+
+    def all_objects(self):
+        """Every entity except bullets, in drawing order."""
+        return [*self.tanks, *self.blocks, *self.bonuses, *self.bangs]